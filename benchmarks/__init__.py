@@ -0,0 +1,5 @@
+"""
+Бенчмарки слоёв доступа к БД и эндпоинтов.
+Запускаются как модули против локального PostgreSQL из настроек DB_*, например:
+python -m benchmarks.query_layers --recreate --sizes 10 100 1000
+"""
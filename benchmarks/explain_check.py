@@ -0,0 +1,247 @@
+"""
+Проверка планов запросов на последовательное сканирование больших таблиц.
+Скрипт пересоздаёт таблицы (используйте отдельную БД!), поэтому запускается только с явным флагом --recreate
+(или с --skip-seed на уже заполненной БД), заполняет их данными заметного объёма,
+собирает SQL, который выполняют GET-эндпоинты core_router и методы DeclarativeSQLQuery,
+и прогоняет для каждого запроса EXPLAIN. Если в плане есть Seq Scan по большой таблице,
+скрипт завершается с кодом 1.
+
+Эндпоинты и методы DeclarativeSQLQuery вызываются по-настоящему, поэтому проверяются и запросы selectinload.
+Метод прерывается на первом запросе на запись (до его выполнения), поэтому данные не меняются. Методы читают
+таблицы целиком, поэтому их запросы собираются на небольших данных (CAPTURE_RESUMES резюме - достаточно, чтобы
+selectinload шёл полными порциями), а EXPLAIN выполняется после заполнения таблиц до заданного объёма.
+Параллельные планы отключаются: на тестовых объёмах планировщик предпочитает параллельное последовательное
+сканирование индексу, а на рабочих - нет.
+
+python -m benchmarks.explain_check --recreate --resumes 1000000
+"""
+import argparse
+import asyncio
+import io
+import json
+import re
+import sys
+from contextlib import redirect_stdout
+
+from sqlalchemy import event, text
+
+from benchmarks.stats import print_table
+from databases_queries import engine
+from databases_queries.declarative import DeclarativeSQLQuery
+
+LARGE_TABLES = {'workers', 'resumes', 'vacancies', 'vacancies_replies'}
+# 1000 работников: порции selectinload по 500 ID
+CAPTURE_RESUMES = 4000
+
+ROUTES = [
+    '/workers',
+    '/workers?include=resumes,resumes_parttime,resumes_fulltime',
+    '/resumes',
+    '/resumes?include=worker,vacancies',
+    '/resumes/1',
+    '/resumes/search?q=python',
+    '/vacancies/search?q=python',
+]
+
+DECLARATIVE_METHODS = [
+    'insert_data',
+    'insert_resumes',
+    'insert_additional_resumes',
+    'update_data',
+    'add_vacancies_and_replies',
+    'convert_workers_to_dto',
+    'select_resumes_avg_salary',
+    'join_cte_subquery_window_func',
+    'select_data',
+    'select_workers_with_selectin_relationship',
+    'select_workers_with_condition_relationship',
+    'select_workers_with_condition_relationship_contains_eager',
+    'select_resumes_with_all_relationships',
+]
+
+# методы, основной (первый) запрос которых по смыслу читает таблицу целиком;
+# запросы загрузки связей, которые выполняются после него, проверяются как обычно
+FULL_SCAN_ALLOWED = {
+    'convert_workers_to_dto',  # LIMIT 3 без сортировки: читает первые строки кучи
+    'select_resumes_avg_salary',
+    'join_cte_subquery_window_func',
+    'select_data',
+    'select_workers_with_selectin_relationship',
+    'select_workers_with_condition_relationship',
+    'select_workers_with_condition_relationship_contains_eager',
+    'select_resumes_with_all_relationships',
+}
+
+TITLES = ['Python Developer', 'Data Scientist', 'Machine Learning Engineer', 'Python Analyst',
+          'Backend Разработчик', 'DevOps Engineer', 'QA Engineer', 'Go Developer']
+
+
+class Captured(Exception):
+    """Прерывание метода перед запросом на запись"""
+
+
+async def seed(resumes: int):
+    """Заполнение таблиц: на каждого работника 4 резюме, на каждую вакансию 20 откликов"""
+    titles = ', '.join(f"'{title}'" for title in TITLES)
+    workers = max(resumes // 4, 1)
+    vacancies = max(resumes // 20, 1)
+    await DeclarativeSQLQuery.recreate_tables()
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO workers (username) SELECT 'worker_' || i FROM generate_series(1, :n) AS i"
+        ), {'n': workers})
+        await conn.execute(text(f"""
+            INSERT INTO resumes (title, salary, workload, worker_id)
+            SELECT (ARRAY[{titles}])[1 + i % {len(TITLES)}] || ' ' || i,
+                   30000 + (i::bigint * 7919) % 300000,
+                   (CASE WHEN i % 3 = 0 THEN 'PARTTIME' ELSE 'FULLTIME' END)::workload,
+                   1 + i % :workers
+            FROM generate_series(1, :n) AS i
+        """), {'n': resumes, 'workers': workers})
+        await conn.execute(text(f"""
+            INSERT INTO vacancies (title, compensation)
+            SELECT (ARRAY[{titles}])[1 + i % {len(TITLES)}] || ' ' || i, 50000 + i % 200000
+            FROM generate_series(1, :n) AS i
+        """), {'n': vacancies})
+        await conn.execute(text("""
+            INSERT INTO vacancies_replies (resume_id, vacancy_id)
+            SELECT i, 1 + i % :vacancies FROM generate_series(1, :n) AS i
+        """), {'n': resumes, 'vacancies': vacancies})
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level='AUTOCOMMIT')
+        await conn.execute(text('ANALYZE'))
+
+
+async def asgi_get(app, url: str) -> int:
+    """GET-запрос к ASGI-приложению без HTTP-сервера, возвращает статус ответа"""
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'explain-check')], 'client': ('127.0.0.1', 0), 'server': ('explain-check', 80),
+    }
+    response_status = 0
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal response_status
+        if message['type'] == 'http.response.start':
+            response_status = message['status']
+
+    await app(scope, receive, send)
+    return response_status
+
+
+async def capture_routes() -> list[tuple[str, str, tuple, bool]]:
+    from main import app
+
+    statements = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        statements.append((route, statement, parameters, False))
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', collect)
+    try:
+        for route in ROUTES:
+            response_status = await asgi_get(app, route)
+            if response_status != 200:
+                raise RuntimeError(f'{route} вернул статус {response_status}')
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', collect)
+    return statements
+
+
+async def capture_declarative() -> list[tuple[str, str, tuple, bool]]:
+    """Запросы методов; последний элемент - основной ли это запрос метода (первый по порядку)"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        top_level = not statements or statements[-1][0] != method
+        statements.append((method, statement, parameters, top_level))
+        if context.isinsert or context.isupdate or context.isdelete:
+            raise Captured
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    try:
+        for method in DECLARATIVE_METHODS:
+            # методы печатают результаты, на заполненных таблицах это сотни тысяч строк
+            with redirect_stdout(io.StringIO()):
+                try:
+                    await getattr(DeclarativeSQLQuery, method)()
+                except Captured:
+                    pass
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+    return statements
+
+
+def seq_scans(plan: dict) -> set[str]:
+    """Большие таблицы, которые план читает последовательным сканированием"""
+    found = set()
+    # секции (resumes_p0, ...) учитываются как их таблица
+    table = re.sub(r'_p\d+$', '', plan.get('Relation Name', ''))
+    if plan.get('Node Type') == 'Seq Scan' and table in LARGE_TABLES:
+        found.add(table)
+    for subplan in plan.get('Plans', []):
+        found |= seq_scans(subplan)
+    return found
+
+
+async def explain(statement: str, parameters) -> dict:
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql('SET LOCAL max_parallel_workers_per_gather = 0')
+        result = await conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+        plan = result.scalar_one()
+        await conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+async def main(resumes: int, skip_seed: bool) -> int:
+    if not skip_seed:
+        await seed(CAPTURE_RESUMES)
+    declarative = await capture_declarative()
+    if not skip_seed:
+        await seed(resumes)
+    rows = []
+    failed = False
+    for name, statement, parameters, top_level in await capture_routes() + declarative:
+        if isinstance(parameters, list):
+            # executemany: план одинаков для всех наборов параметров
+            parameters = parameters[0]
+        scans = seq_scans(await explain(statement, parameters))
+        allowed = top_level and name in FULL_SCAN_ALLOWED
+        status = 'ok' if not scans else ('allowed' if allowed else 'FAIL')
+        failed = failed or status == 'FAIL'
+        rows.append({
+            'query': name,
+            'seq_scan': ', '.join(sorted(scans)) or '-',
+            'status': status,
+            'sql': ' '.join(statement.split())[:80],
+        })
+    await engine.dispose()
+    print_table(rows)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='EXPLAIN-проверка запросов на Seq Scan больших таблиц')
+    parser.add_argument('--resumes', type=int, default=1000000, help='Число резюме в тестовых данных')
+    parser.add_argument(
+        '--skip-seed', action='store_true',
+        help='Не пересоздавать и не заполнять таблицы (методы DeclarativeSQLQuery прочитают имеющиеся данные целиком)'
+    )
+    parser.add_argument(
+        '--recreate', action='store_true',
+        help='Подтверждение: пересоздать таблицы и удалить все данные БД из настроек DB_*'
+    )
+    args = parser.parse_args()
+    if not args.recreate and not args.skip_seed:
+        parser.error(
+            'проверка удаляет все данные БД из настроек DB_*: запустите на отдельной БД с --recreate '
+            'или на заполненной с --skip-seed'
+        )
+    sys.exit(asyncio.run(main(args.resumes, args.skip_seed)))
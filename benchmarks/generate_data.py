@@ -0,0 +1,216 @@
+"""
+Генератор синтетических данных для нагрузочного тестирования.
+Заполняет workers, resumes, vacancies и vacancies_replies до заданного масштаба. Распределения
+приближены к реальным: у небольшой части работников много резюме, зарплаты распределены
+логнормально, отклики сосредоточены на популярных вакансиях.
+
+Таблицы делятся на диапазоны ID, каждый диапазон генерируется и пишется через COPY в отдельном
+процессе со своим соединением (--connections процессов одновременно). ID задаются явно, после загрузки
+последовательности сдвигаются на максимальный ID. На время загрузки пользовательские триггеры resumes
+и vacancies_replies отключаются, после неё счётчики resume_count/reply_count пересчитываются одним
+запросом, а гистограмма зарплат перестраивается с нуля.
+
+python -m benchmarks.generate_data --resumes 10000000 --connections 8 --recreate
+"""
+import argparse
+import asyncio
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from time import perf_counter
+
+import asyncpg
+from sqlalchemy import make_url, text
+
+from config import database_settings
+from core.analytics import REBUILD_HISTOGRAM
+from core.counters import repair_all
+from databases_queries import engine
+from databases_queries.declarative import DeclarativeSQLQuery
+from models.enums import WorkLoad
+
+LEVELS = ['Junior', 'Middle', 'Senior', 'Lead']
+ROLES = [
+    ('Python Developer', 30), ('Java Developer', 20), ('Frontend Developer', 20), ('Data Scientist', 8),
+    ('Data Engineer', 6), ('DevOps Engineer', 8), ('QA Engineer', 12), ('Go Developer', 6),
+    ('Backend Разработчик', 10), ('Аналитик данных', 8), ('Системный администратор', 5), ('Product Manager', 4),
+]
+LEVEL_SALARY = {'Junior': 70000, 'Middle': 140000, 'Senior': 230000, 'Lead': 300000}
+COVER_LETTERS = [
+    'Здравствуйте! Заинтересовала ваша вакансия.',
+    'Готов приступить к работе в ближайшее время.',
+    'Имею релевантный опыт, резюме прилагаю.',
+]
+SKEW = 2.0
+# таблицы, триггеры которых отключаются на время загрузки
+TRIGGERED_TABLES = ['resumes', 'vacancies_replies']
+
+
+def dsn() -> str:
+    return make_url(database_settings.database_url).set(drivername='postgresql').render_as_string(hide_password=False)
+
+
+def skewed_id(rng: random.Random, upper: int) -> int:
+    """ID от 1 до upper, малые значения встречаются чаще (степенное распределение)"""
+    return 1 + min(int(upper * rng.random() ** SKEW), upper - 1)
+
+
+def title(rng: random.Random) -> str:
+    role = rng.choices([role for role, _ in ROLES], weights=[weight for _, weight in ROLES])[0]
+    return f'{rng.choice(LEVELS)} {role}'
+
+
+def salary(rng: random.Random, resume_title: str) -> int | None:
+    if rng.random() < 0.05:
+        return None
+    base = LEVEL_SALARY[resume_title.split(' ', 1)[0]]
+    return int(round(rng.lognormvariate(math.log(base), 0.35), -3))
+
+
+def poisson(rng: random.Random, lam: float) -> int:
+    """Случайная величина с распределением Пуассона (метод Кнута)"""
+    limit, count, product = math.exp(-lam), 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def workers_records(rng: random.Random, start: int, stop: int, scale: dict) -> list[tuple]:
+    return [(worker_id, f'worker_{worker_id}') for worker_id in range(start, stop)]
+
+
+def vacancies_records(rng: random.Random, start: int, stop: int, scale: dict) -> list[tuple]:
+    records = []
+    for vacancy_id in range(start, stop):
+        vacancy_title = title(rng)
+        records.append((vacancy_id, vacancy_title, salary(rng, vacancy_title) or LEVEL_SALARY['Middle']))
+    return records
+
+
+def resumes_records(rng: random.Random, start: int, stop: int, scale: dict) -> list[tuple]:
+    records = []
+    for resume_id in range(start, stop):
+        resume_title = title(rng)
+        workload = WorkLoad.FULLTIME if rng.random() < 0.7 else WorkLoad.PARTTIME
+        # Enum-колонки SQLAlchemy хранит по имени члена перечисления
+        records.append((resume_id, resume_title, salary(rng, resume_title), workload.name,
+                        skewed_id(rng, scale['workers'])))
+    return records
+
+
+def replies_records(rng: random.Random, start: int, stop: int, scale: dict) -> list[tuple]:
+    records = []
+    for resume_id in range(start, stop):
+        vacancy_ids = {skewed_id(rng, scale['vacancies']) for _ in range(poisson(rng, scale['replies_per_resume']))}
+        for vacancy_id in vacancy_ids:
+            cover_letter = rng.choice(COVER_LETTERS) if rng.random() < 0.3 else None
+            records.append((resume_id, vacancy_id, cover_letter))
+    return records
+
+
+TABLES = {
+    'workers': (workers_records, ['id', 'username']),
+    'vacancies': (vacancies_records, ['id', 'title', 'compensation']),
+    'resumes': (resumes_records, ['id', 'title', 'salary', 'workload', 'worker_id']),
+    # отклики генерируются по диапазонам ID резюме
+    'vacancies_replies': (replies_records, ['resume_id', 'vacancy_id', 'cover_letter']),
+}
+
+
+async def _copy_chunk(table: str, records: list[tuple], columns: list[str]):
+    connection = await asyncpg.connect(dsn())
+    try:
+        await connection.copy_records_to_table(table, records=records, columns=columns)
+    finally:
+        await connection.close()
+
+
+def load_chunk(table: str, start: int, stop: int, scale: dict, seed: int) -> int:
+    """Генерация и запись диапазона ID [start, stop) таблицы; выполняется в отдельном процессе"""
+    generate, columns = TABLES[table]
+    rng = random.Random(f'{seed}:{table}:{start}')
+    records = generate(rng, start, stop, scale)
+    asyncio.run(_copy_chunk(table, records, columns))
+    return len(records)
+
+
+def chunks(total: int, chunk_size: int) -> list[tuple[int, int]]:
+    return [(start, min(start + chunk_size, total + 1)) for start in range(1, total + 1, chunk_size)]
+
+
+async def load_tables(pool: ProcessPoolExecutor, tables: list[str], scale: dict, chunk_size: int, seed: int):
+    """Параллельная загрузка таблиц одной фазы"""
+    loop = asyncio.get_running_loop()
+    started = perf_counter()
+    jobs = [
+        (table, loop.run_in_executor(pool, load_chunk, table, start, stop, scale, seed))
+        for table in tables
+        for start, stop in chunks(scale['resumes' if table == 'vacancies_replies' else table], chunk_size)
+    ]
+    await asyncio.gather(*(job for _, job in jobs))
+    rows = {table: sum(job.result() for job_table, job in jobs if job_table == table) for table in tables}
+    elapsed = perf_counter() - started
+    for table, count in rows.items():
+        print(f'{table}: {count} строк за {elapsed:.1f} с ({count / elapsed:.0f} строк/с)')
+
+
+async def main(resumes: int, resumes_per_worker: float, resumes_per_vacancy: float, replies_per_resume: float,
+               connections: int, chunk_size: int, recreate: bool, seed: int):
+    if recreate:
+        await DeclarativeSQLQuery.recreate_tables()
+    scale = {
+        'resumes': resumes,
+        'workers': max(math.ceil(resumes / resumes_per_worker), 1),
+        'vacancies': max(math.ceil(resumes / resumes_per_vacancy), 1),
+        'replies_per_resume': replies_per_resume,
+    }
+    async with engine.begin() as conn:
+        existing = {
+            table: (await conn.execute(text(f'SELECT coalesce(max(id), 0) FROM {table}'))).scalar_one()
+            for table in ('workers', 'vacancies', 'resumes')
+        }
+        if any(existing.values()):
+            raise SystemExit(f'Таблицы не пусты ({existing}), запустите с --recreate')
+        for table in TRIGGERED_TABLES:
+            await conn.execute(text(f'ALTER TABLE {table} DISABLE TRIGGER USER'))
+
+    try:
+        with ProcessPoolExecutor(max_workers=connections, mp_context=get_context('spawn')) as pool:
+            # фазы идут в порядке внешних ключей
+            await load_tables(pool, ['workers', 'vacancies'], scale, chunk_size, seed)
+            await load_tables(pool, ['resumes'], scale, chunk_size, seed)
+            await load_tables(pool, ['vacancies_replies'], scale, chunk_size, seed)
+    finally:
+        async with engine.begin() as conn:
+            for table in TRIGGERED_TABLES:
+                await conn.execute(text(f'ALTER TABLE {table} ENABLE TRIGGER USER'))
+
+    async with engine.begin() as conn:
+        for table in ('workers', 'vacancies', 'resumes'):
+            await conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+            ))
+        await repair_all(conn)
+        for statement in REBUILD_HISTOGRAM:
+            await conn.execute(statement)
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level='AUTOCOMMIT')
+        await conn.execute(text('ANALYZE'))
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Генерация синтетических данных через COPY')
+    parser.add_argument('--resumes', type=int, default=1000000, help='Число резюме')
+    parser.add_argument('--resumes-per-worker', type=float, default=4, help='Среднее число резюме на работника')
+    parser.add_argument('--resumes-per-vacancy', type=float, default=20, help='Число резюме на одну вакансию')
+    parser.add_argument('--replies-per-resume', type=float, default=1.5, help='Среднее число откликов резюме')
+    parser.add_argument('--connections', type=int, default=8, help='Число параллельных процессов-загрузчиков')
+    parser.add_argument('--chunk-size', type=int, default=100000, help='Размер диапазона ID одной порции COPY')
+    parser.add_argument('--recreate', action='store_true', help='Пересоздать таблицы перед загрузкой')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(main(args.resumes, args.resumes_per_worker, args.resumes_per_vacancy, args.replies_per_resume,
+                     args.connections, args.chunk_size, args.recreate, args.seed))
@@ -0,0 +1,102 @@
+"""
+Нагрузочный тест запущенного приложения.
+--concurrency виртуальных клиентов в течение --duration секунд выполняют запросы к маршрутам core_router,
+выбирая сценарий случайно с весами из --mix. Для каждого сценария и в целом выводятся число запросов,
+ошибок, пропускная способность (запросов в секунду) и задержки p50/p99.
+Случайные ID и курсоры берутся в пределах --max-id (например, --resumes генератора данных).
+
+python -m benchmarks.load_test --base-url http://localhost:8000 --concurrency 64 --duration 60 \
+    --mix workers=2 resumes=2 resume=5 resume_search=1 vacancy_search=1
+"""
+import argparse
+import asyncio
+import random
+from collections import defaultdict
+from time import perf_counter
+
+import httpx
+
+from benchmarks.stats import print_table, summarize
+from core.pagination import encode_cursor
+
+SEARCH_TERMS = ['python', 'java', 'devops', 'senior', 'junior', 'аналитик', 'frontend', 'engineer']
+
+
+def deep_cursor(rng: random.Random, max_id: int) -> str:
+    # первые страницы запрашиваются чаще глубоких
+    return encode_cursor(id=int(max_id * rng.random() ** 2))
+
+
+SCENARIOS = {
+    'workers': lambda rng, max_id: f'/workers?cursor={deep_cursor(rng, max_id // 4)}',
+    'resumes': lambda rng, max_id: f'/resumes?cursor={deep_cursor(rng, max_id)}',
+    'resume': lambda rng, max_id: f'/resumes/{rng.randint(1, max_id)}',
+    'resume_search': lambda rng, max_id: f'/resumes/search?q={rng.choice(SEARCH_TERMS)}',
+    'vacancy_search': lambda rng, max_id: f'/vacancies/search?q={rng.choice(SEARCH_TERMS)}',
+}
+
+
+def parse_mix(mix: list[str]) -> dict[str, float]:
+    weights = {}
+    for item in mix:
+        name, _, weight = item.partition('=')
+        if name not in SCENARIOS:
+            raise SystemExit(f'Неизвестный сценарий {name}, доступны: {", ".join(SCENARIOS)}')
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def client(http: httpx.AsyncClient, rng: random.Random, weights: dict[str, float], max_id: int,
+                 deadline: float, latencies: dict[str, list[float]], errors: dict[str, int]):
+    names, scenario_weights = list(weights), list(weights.values())
+    while perf_counter() < deadline:
+        name = rng.choices(names, weights=scenario_weights)[0]
+        started = perf_counter()
+        try:
+            response = await http.get(SCENARIOS[name](rng, max_id))
+            # 404 для случайного ID - ожидаемый ответ, а не ошибка
+            failed = response.status_code >= 500 or response.status_code in (400, 422)
+        except httpx.HTTPError:
+            failed = True
+        latencies[name].append(perf_counter() - started)
+        if failed:
+            errors[name] += 1
+
+
+async def main(base_url: str, concurrency: int, duration: float, weights: dict[str, float], max_id: int, seed: int):
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as http:
+        started = perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            client(http, random.Random(seed + index), weights, max_id, deadline, latencies, errors)
+            for index in range(concurrency)
+        ))
+        elapsed = perf_counter() - started
+
+    rows = []
+    for name in weights:
+        rows.append({'scenario': name, 'errors': errors[name], **summarize(latencies[name]),
+                     'rps': round(len(latencies[name]) / elapsed, 1)})
+    everything = [latency for scenario_latencies in latencies.values() for latency in scenario_latencies]
+    rows.append({'scenario': 'total', 'errors': sum(errors.values()), **summarize(everything),
+                 'rps': round(len(everything) / elapsed, 1)})
+    # throughput из summarize - обратная средняя задержка одного клиента, общую нагрузку показывает rps
+    for row in rows:
+        del row['throughput']
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Нагрузочный тест маршрутов core_router')
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--concurrency', type=int, default=32, help='Число одновременных клиентов')
+    parser.add_argument('--duration', type=float, default=30, help='Длительность теста в секундах')
+    parser.add_argument('--mix', nargs='+', default=['workers=2', 'resumes=2', 'resume=5', 'resume_search=1',
+                                                     'vacancy_search=1'], help='Сценарии с весами: имя=вес')
+    parser.add_argument('--max-id', type=int, default=1000000, help='Верхняя граница случайных ID резюме')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.concurrency, args.duration, parse_mix(args.mix), args.max_id, args.seed))
@@ -0,0 +1,151 @@
+"""
+Сравнение поиска в обычных и хэш-секционированных таблицах.
+В отдельной схеме partition_bench создаются две копии resumes и vacancies_replies - обычная и
+секционированная так же, как в приложении (resumes по worker_id, vacancies_replies по vacancy_id), -
+и заполняются одинаковыми данными. Для типичных поисков выводятся задержки p50/p99 и число секций,
+которые план реально читает (по EXPLAIN ANALYZE): если ключ секционирования есть в условии, лишние
+секции отсекаются (partition pruning), иначе запрос обходит индексы всех секций.
+Таблицы приложения не затрагиваются, схема удаляется в конце.
+
+python -m benchmarks.partition_pruning --resumes 2000000 --partitions 16 --repeat 300
+"""
+import argparse
+import asyncio
+import json
+import random
+
+from sqlalchemy import text
+
+from benchmarks.stats import print_table, summarize, timed
+from databases_queries import engine
+
+SCHEMA = 'partition_bench'
+
+
+def resume_with_worker(resume_id: int, scale: dict) -> dict:
+    # так распределены работники в тестовых данных
+    return {'id': resume_id, 'worker_id': 1 + resume_id % scale['workers']}
+
+
+# (название, запрос, генератор параметров)
+LOOKUPS = [
+    ('resumes by worker_id', 'SELECT * FROM {resumes} WHERE worker_id = ANY(:ids)',
+     lambda rng, scale: {'ids': [rng.randint(1, scale['workers']) for _ in range(20)]}),
+    ('resume by id', 'SELECT * FROM {resumes} WHERE id = :id',
+     lambda rng, scale: {'id': rng.randint(1, scale['resumes'])}),
+    ('resume by id and worker_id', 'SELECT * FROM {resumes} WHERE id = :id AND worker_id = :worker_id',
+     lambda rng, scale: resume_with_worker(rng.randint(1, scale['resumes']), scale)),
+    ('resumes page by id', 'SELECT * FROM {resumes} WHERE id > :after_id ORDER BY id LIMIT 21',
+     lambda rng, scale: {'after_id': rng.randint(0, scale['resumes'])}),
+    ('replies by vacancy_id', 'SELECT * FROM {replies} WHERE vacancy_id = :vacancy_id',
+     lambda rng, scale: {'vacancy_id': rng.randint(1, scale['vacancies'])}),
+    ('replies by resume_id', 'SELECT * FROM {replies} WHERE resume_id = :resume_id',
+     lambda rng, scale: {'resume_id': rng.randint(1, scale['resumes'])}),
+]
+
+
+async def create_tables(scale: dict, partitions: int):
+    async with engine.begin() as conn:
+        await conn.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+        await conn.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+        # как в приложении: ключ секционирования resumes входит в первичный ключ
+        for layout, resumes_pk, resumes_suffix, replies_suffix in (
+            ('plain', 'id', '', ''),
+            ('partitioned', 'id, worker_id', ' PARTITION BY HASH (worker_id)', ' PARTITION BY HASH (vacancy_id)'),
+        ):
+            await conn.execute(text(f"""
+                CREATE TABLE {SCHEMA}.resumes_{layout} (
+                    id integer NOT NULL, worker_id integer NOT NULL, title varchar(256) NOT NULL, salary integer,
+                    PRIMARY KEY ({resumes_pk})
+                ){resumes_suffix}
+            """))
+            await conn.execute(text(f"""
+                CREATE TABLE {SCHEMA}.replies_{layout} (
+                    resume_id integer NOT NULL, vacancy_id integer NOT NULL, cover_letter varchar,
+                    PRIMARY KEY (resume_id, vacancy_id)
+                ){replies_suffix}
+            """))
+            if layout == 'partitioned':
+                for remainder in range(partitions):
+                    for table in ('resumes', 'replies'):
+                        parent = f'{SCHEMA}.{table}_{layout}'
+                        await conn.execute(text(
+                            f'CREATE TABLE {parent}_p{remainder} PARTITION OF {parent} '
+                            f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+                        ))
+            await conn.execute(text(f"""
+                INSERT INTO {SCHEMA}.resumes_{layout} (id, worker_id, title, salary)
+                SELECT i, 1 + i % :workers, 'Resume ' || i, 30000 + (i::bigint * 7919) % 300000
+                FROM generate_series(1, :resumes) AS i
+            """), scale)
+            await conn.execute(text(f"""
+                INSERT INTO {SCHEMA}.replies_{layout} (resume_id, vacancy_id)
+                SELECT i, 1 + (i * 31) % :vacancies FROM generate_series(1, :resumes) AS i
+            """), scale)
+            await conn.execute(text(f'CREATE INDEX ON {SCHEMA}.resumes_{layout} (worker_id)'))
+            await conn.execute(text(f'CREATE INDEX ON {SCHEMA}.replies_{layout} (vacancy_id)'))
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level='AUTOCOMMIT')
+        await conn.execute(text(f'ANALYZE {SCHEMA}.resumes_plain, {SCHEMA}.resumes_partitioned, '
+                                f'{SCHEMA}.replies_plain, {SCHEMA}.replies_partitioned'))
+
+
+def scanned_relations(plan: dict) -> set[str]:
+    """Таблицы и секции, которые план действительно читал (узлы с loops > 0)"""
+    found = set()
+    if 'Relation Name' in plan and plan.get('Actual Loops', 0) > 0:
+        found.add(plan['Relation Name'])
+    for subplan in plan.get('Plans', []):
+        found |= scanned_relations(subplan)
+    return found
+
+
+async def run_query(statement: str, params: dict):
+    async with engine.connect() as conn:
+        await conn.execute(text(statement), params)
+
+
+async def explain(statement: str, params: dict) -> dict:
+    async with engine.connect() as conn:
+        plan = (await conn.execute(text(f'EXPLAIN (ANALYZE, FORMAT JSON) {statement}'), params)).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+async def main(resumes: int, partitions: int, repeat: int, seed: int, keep: bool):
+    scale = {'resumes': resumes, 'workers': max(resumes // 4, 1), 'vacancies': max(resumes // 20, 1)}
+    await create_tables(scale, partitions)
+    rows = []
+    for name, template, make_params in LOOKUPS:
+        for layout in ('plain', 'partitioned'):
+            statement = template.format(resumes=f'{SCHEMA}.resumes_{layout}', replies=f'{SCHEMA}.replies_{layout}')
+            rng = random.Random(seed)
+            # прогрев: соединения пула и страницы индексов в кэше
+            for _ in range(min(repeat, 20)):
+                await run_query(statement, make_params(rng, scale))
+            rng = random.Random(seed)
+            latencies = [await timed(run_query(statement, make_params(rng, scale))) for _ in range(repeat)]
+            scanned = scanned_relations(await explain(statement, make_params(random.Random(seed), scale)))
+            rows.append({
+                'lookup': name,
+                'layout': layout,
+                'scanned': len(scanned),
+                **summarize(latencies),
+            })
+    if not keep:
+        async with engine.begin() as conn:
+            await conn.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
+    await engine.dispose()
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Бенчмарк отсечения секций (partition pruning)')
+    parser.add_argument('--resumes', type=int, default=1000000)
+    parser.add_argument('--partitions', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keep', action='store_true', help='Не удалять схему с тестовыми таблицами')
+    args = parser.parse_args()
+    asyncio.run(main(args.resumes, args.partitions, args.repeat, args.seed, args.keep))
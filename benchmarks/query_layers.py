@@ -0,0 +1,80 @@
+"""
+Сравнение слоёв доступа к БД: RawSQL, QueryBuilderSQL и ORM (OrmSQL).
+Для каждого слоя и размера данных замеряются вставка size строк, выборка всей таблицы из size строк
+и обновление одной строки по ID. Выводятся пропускная способность (строк или операций в секунду)
+и задержки p50/p99.
+
+Бенчмарк пересоздаёт таблицы и многократно очищает workers вместе со всеми связанными таблицами
+(используйте отдельную БД!), поэтому запускается только с явным флагом --recreate.
+
+python -m benchmarks.query_layers --recreate --sizes 10 100 1000 10000 --repeat 30
+"""
+import argparse
+import asyncio
+import random
+
+from sqlalchemy import text
+
+from benchmarks.stats import print_table, summarize, timed
+from databases_queries import engine
+from databases_queries.declarative import DeclarativeSQLQuery, OrmSQL
+from databases_queries.imperative import QueryBuilderSQL, RawSQL
+
+LAYERS = [RawSQL, QueryBuilderSQL, OrmSQL]
+
+
+async def truncate_workers():
+    async with engine.begin() as conn:
+        await conn.execute(text('TRUNCATE workers RESTART IDENTITY CASCADE'))
+
+
+async def bench_layer(layer, size: int, repeat: int) -> list[dict]:
+    usernames = [f'worker_{index}' for index in range(size)]
+
+    insert_latencies = []
+    for _ in range(repeat):
+        await truncate_workers()
+        insert_latencies.append(await timed(layer.insert_data(usernames)))
+
+    # после последней итерации в таблице ровно size строк
+    select_latencies = [await timed(layer.select_data()) for _ in range(repeat)]
+    update_latencies = [
+        await timed(layer.update_data(worker_id=random.randint(1, size), new_username='updated'))
+        for _ in range(repeat)
+    ]
+    return [
+        {'layer': layer.__name__, 'operation': 'insert', 'size': size, **summarize(insert_latencies, size)},
+        {'layer': layer.__name__, 'operation': 'select', 'size': size, **summarize(select_latencies, size)},
+        {'layer': layer.__name__, 'operation': 'update', 'size': size, **summarize(update_latencies)},
+    ]
+
+
+async def main(sizes: list[int], repeat: int, seed: int):
+    random.seed(seed)
+    await DeclarativeSQLQuery.recreate_tables()
+    results = []
+    for size in sizes:
+        for layer in LAYERS:
+            # прогрев: соединения пула и кэш скомпилированных запросов
+            await truncate_workers()
+            await layer.insert_data(['warmup'])
+            await layer.select_data()
+            results.extend(await bench_layer(layer, size, repeat))
+    await truncate_workers()
+    await engine.dispose()
+    print_table(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Бенчмарк RawSQL, QueryBuilderSQL и ORM')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument(
+        '--recreate', action='store_true',
+        help='Подтверждение: пересоздать таблицы и удалить все данные БД из настроек DB_*'
+    )
+    args = parser.parse_args()
+    if not args.recreate:
+        parser.error('бенчмарк удаляет все данные БД из настроек DB_*: запустите на отдельной БД с --recreate')
+    asyncio.run(main(args.sizes, args.repeat, args.seed))
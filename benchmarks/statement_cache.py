@@ -0,0 +1,122 @@
+"""
+Накладные расходы на построение запросов горячих маршрутов.
+Для каждого запроса сравниваются два варианта: конструкция, собираемая заново на каждый запрос
+(как раньше в core/core.py), и заранее построенная конструкция из core.statements или core.loaders.
+Замеряются построение select() с опциями, вычисление ключа кэша SQLAlchemy (по нему ищется
+скомпилированный SQL) и их сумма - работа, которая выполняется на каждый запрос до обращения к БД.
+Отдельно для справки приводится полная компиляция - её цена при промахе кэша.
+Также проверяется, что текст SQL не зависит от параметров, т.е. asyncpg переиспользует подготовленный оператор.
+БД для замеров не нужна.
+
+python -m benchmarks.statement_cache --repeat 10000
+"""
+import argparse
+import random
+from time import perf_counter
+
+from sqlalchemy import any_, select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.orm import configure_mappers, joinedload, load_only, selectinload
+
+from benchmarks.stats import percentile, print_table
+from core.loaders import BatchLoader
+from core.statements import resumes_page, workers_page
+from models.declarative_models import ResumesOrm, VacanciesOrm, WorkersOrm
+
+DIALECT = asyncpg_dialect()
+
+
+def build_workers_page(after_id: int, limit: int):
+    return (
+        select(WorkersOrm)
+        .options(
+            load_only(WorkersOrm.id, WorkersOrm.username, WorkersOrm.resume_count),
+            selectinload(WorkersOrm.resumes)
+        )
+        .filter(WorkersOrm.id > after_id)
+        .order_by(WorkersOrm.id)
+        .limit(limit)
+    )
+
+
+def build_resumes_page(after_id: int, limit: int):
+    return (
+        select(ResumesOrm)
+        .options(joinedload(ResumesOrm.worker))
+        .options(selectinload(ResumesOrm.vacancies_replied).load_only(VacanciesOrm.title))
+        .filter(ResumesOrm.id > after_id)
+        .order_by(ResumesOrm.id)
+        .limit(limit)
+    )
+
+
+def build_resumes_by_ids(resume_id: int, limit: int):
+    return select(ResumesOrm).filter(ResumesOrm.id == any_(list(range(resume_id, resume_id + limit))))
+
+
+QUERIES = [
+    ('workers_page', build_workers_page, workers_page(include=('resumes',))),
+    ('resumes_page', build_resumes_page, resumes_page(include=('worker', 'vacancies'))),
+    ('resumes_by_ids', build_resumes_by_ids, BatchLoader(ResumesOrm).query),
+]
+
+
+def microseconds(seconds: float) -> float:
+    return round(seconds * 1_000_000, 2)
+
+
+def measure(build, repeat: int) -> dict:
+    build_latencies, key_latencies, total_latencies = [], [], []
+    for _ in range(repeat):
+        started = perf_counter()
+        statement = build(random.randint(1, 1_000_000), random.randint(2, 101))
+        built = perf_counter()
+        statement._generate_cache_key()
+        finished = perf_counter()
+        build_latencies.append(built - started)
+        key_latencies.append(finished - built)
+        total_latencies.append(finished - started)
+    return {
+        'build_p50_us': microseconds(percentile(build_latencies, 50)),
+        'cache_key_p50_us': microseconds(percentile(key_latencies, 50)),
+        'total_p50_us': microseconds(percentile(total_latencies, 50)),
+        'total_p99_us': microseconds(percentile(total_latencies, 99)),
+    }
+
+
+def compile_us(statement, repeat: int) -> float:
+    started = perf_counter()
+    for _ in range(repeat):
+        statement.compile(dialect=DIALECT)
+    return microseconds((perf_counter() - started) / repeat)
+
+
+def distinct_sql(build, prebuilt) -> tuple[int, int]:
+    """Число разных текстов SQL для 100 случайных наборов параметров"""
+    inline = {str(build(random.randint(1, 1000), random.randint(2, 101)).compile(dialect=DIALECT))
+              for _ in range(100)}
+    return len(inline), len({str(prebuilt.compile(dialect=DIALECT))})
+
+
+def main(repeat: int, seed: int):
+    random.seed(seed)
+    configure_mappers()
+    rows = []
+    for name, build, prebuilt in QUERIES:
+        # прогрев: ленивые структуры опций и мапперов
+        measure(build, 100)
+        measure(lambda *_: prebuilt, 100)
+        inline_sql, prebuilt_sql = distinct_sql(build, prebuilt)
+        rows.append({'query': name, 'variant': 'inline', **measure(build, repeat),
+                     'compile_us': compile_us(build(1, 21), max(repeat // 100, 10)), 'distinct_sql': inline_sql})
+        rows.append({'query': name, 'variant': 'prebuilt', **measure(lambda *_: prebuilt, repeat),
+                     'compile_us': compile_us(prebuilt, max(repeat // 100, 10)), 'distinct_sql': prebuilt_sql})
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Бенчмарк построения и ключа кэша запросов горячих маршрутов')
+    parser.add_argument('--repeat', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    main(args.repeat, args.seed)
@@ -0,0 +1,43 @@
+"""
+Статистика замеров: перцентили задержек и пропускная способность
+"""
+import math
+from time import perf_counter
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль q (0..100) методом ближайшего ранга"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies: list[float], items_per_op: int = 1) -> dict:
+    """Сводка по задержкам операций (в секундах)"""
+    total = sum(latencies)
+    return {
+        'ops': len(latencies),
+        'throughput': round(len(latencies) * items_per_op / total, 1) if total else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def timed(coroutine) -> float:
+    """Время выполнения корутины в секундах"""
+    started = perf_counter()
+    await coroutine
+    return perf_counter() - started
+
+
+def print_table(rows: list[dict]):
+    """Вывод результатов в виде выровненной таблицы"""
+    if not rows:
+        return
+    columns = list(rows[0])
+    widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) for column in columns}
+    print('  '.join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print('  '.join(str(row[column]).ljust(widths[column]) for column in columns))
@@ -10,6 +10,34 @@ class DatabasesSettings(BaseSettings):
     USER: str
     PASSWORD: str
 
+    ECHO: bool = False
+    # параметры пула соединений SQLAlchemy (на каждый процесс приложения)
+    POOL_SIZE: int = 5
+    MAX_OVERFLOW: int = 10
+    POOL_TIMEOUT: float = 30
+    POOL_RECYCLE: int = -1
+    POOL_PRE_PING: bool = False
+    # предел соединений с каждым сервером БД от всех процессов приложения (0 - без ограничения),
+    # должен быть меньше max_connections Postgres с запасом для миграций и служебных подключений
+    MAX_CONNECTIONS: int = 0
+    # размер кэша подготовленных выражений asyncpg и кэша SQLAlchemy поверх него
+    STATEMENT_CACHE_SIZE: int = 100
+    PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    # реплики для чтения: полные URL через запятую
+    REPLICA_URLS: str = ''
+    # на сколько секунд исключать реплику из ротации после ошибки подключения
+    REPLICA_RETRY_AFTER: float = 30
+    # сколько секунд после записи читать данные клиента с основного сервера (0 - выключено)
+    READ_YOUR_WRITES_SECONDS: float = 0
+    # максимум SQL-запросов на HTTP-запрос по умолчанию (0 - без ограничения) и реакция на превышение
+    QUERY_BUDGET: int = 0
+    QUERY_BUDGET_STRICT: bool = False
+    # число хэш-секций resumes (по worker_id) и vacancies_replies (по vacancy_id), 0 - без секционирования;
+    # значение должно совпадать с тем, с которым применялась миграция секционирования
+    PARTITIONS: int = 0
+    # сколько одинаковых запросов за HTTP-запрос считать признаком N+1
+    REPEATED_QUERY_THRESHOLD: int = 3
+
     class Config:
         env_prefix = 'DB_'
         case_sensitive = False
@@ -19,5 +47,53 @@ class DatabasesSettings(BaseSettings):
     def database_url(self) -> str:
         return f'postgresql+asyncpg://{self.USER}:{self.PASSWORD}@{self.HOSTNAME}:{self.PORT}/{self.NAME}'
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.REPLICA_URLS.split(',') if url.strip()]
+
+
+class CacheSettings(BaseSettings):
+    """Настройки кэша ответов"""
+
+    RESUMES_MAX_SIZE: int = 10000
+    RESUMES_TTL: float = 300
+
+    class Config:
+        env_prefix = 'CACHE_'
+        case_sensitive = False
+        env_file = '.env'
+
+
+class AnalyticsSettings(BaseSettings):
+    """Настройки материализованной аналитики"""
+
+    # допустимое по умолчанию отставание аналитики от таблицы resumes, секунды
+    MAX_STALENESS: float = 60
+    SALARY_BUCKET_WIDTH: int = 10000
+
+    class Config:
+        env_prefix = 'ANALYTICS_'
+        case_sensitive = False
+        env_file = '.env'
+
+
+class AppSettings(BaseSettings):
+    """Настройки запуска приложения"""
+
+    HOST: str = '127.0.0.1'
+    PORT: int = 8000
+    # открыть при старте POOL_SIZE соединений каждого движка
+    PREFILL_POOL: bool = True
+    # выполнить при старте по одному запросу к каждому GET-маршруту из WARMUP_PATHS
+    WARMUP_QUERIES: bool = False
+
+    class Config:
+        env_prefix = 'APP_'
+        case_sensitive = False
+        env_file = '.env'
+
 
 database_settings = DatabasesSettings()
+cache_settings = CacheSettings()
+analytics_settings = AnalyticsSettings()
+app_settings = AppSettings()
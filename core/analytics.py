@@ -0,0 +1,196 @@
+"""
+Аналитика зарплат резюме по типу занятости и слову заголовка.
+Запросы читают материализованную гистограмму resume_salary_histogram, а не таблицу resumes.
+Триггеры на resumes пишут изменения в журнал resume_salary_changes, который при обновлении
+вычитывается и добавляется к гистограмме, поэтому обновление стоит пропорционально числу изменений.
+Если данные старше допустимого отставания, они обновляются перед ответом; фактическое отставание
+возвращается клиенту вместе с результатом.
+
+Полное построение читает всю таблицу resumes и блокирует запись в неё, поэтому в HTTP-запросе не выполняется:
+гистограмму строит миграция, а перестраивает (после загрузки данных в обход триггеров или смены ширины корзины)
+эта команда. Пока гистограмма не построена, эндпоинт отвечает 503.
+
+python -m core.analytics
+"""
+import asyncio
+import logging
+from itertools import groupby
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, status
+from sqlalchemy import extract, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import analytics_settings
+from core.serialization import serialized_response
+from databases_queries import depends_session, engine, session_factory
+from models.declarative_models import AnalyticsRefreshesOrm, ResumeSalaryHistogramOrm
+from models.schemas import SalaryAnalyticsDTO
+
+BUCKET_WIDTH = analytics_settings.SALARY_BUCKET_WIDTH
+# при смене ширины корзины состояние не найдётся, и гистограмма будет перестроена с нуля
+REFRESH_NAME = f'resume_salary:{BUCKET_WIDTH}'
+PERCENTILES = (50, 90, 99)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+logger.addHandler(logging.StreamHandler())
+
+# каждое резюме попадает в строку '' (все резюме) и в строку каждого слова заголовка
+_KEYWORDS = r"""
+CROSS JOIN LATERAL (
+    SELECT '' AS keyword
+    UNION
+    SELECT word FROM regexp_split_to_table(lower(source.title), '\W+') AS word WHERE word <> ''
+) AS keywords
+"""
+
+_apply_changes = text(f"""
+WITH source AS (
+    DELETE FROM resume_salary_changes RETURNING workload, title, salary, sign
+)
+INSERT INTO resume_salary_histogram AS histogram (workload, keyword, bucket, resumes_count, salary_sum)
+SELECT workload, keyword, salary / :bucket_width * :bucket_width, sum(sign), sum(sign * salary)
+FROM source {_KEYWORDS}
+GROUP BY 1, 2, 3
+ON CONFLICT (workload, keyword, bucket) DO UPDATE SET
+    resumes_count = histogram.resumes_count + excluded.resumes_count,
+    salary_sum = histogram.salary_sum + excluded.salary_sum
+""")
+
+_mark_refreshed = text("""
+INSERT INTO analytics_refreshes (name, refreshed_at) VALUES (:name, TIMEZONE('utc', now()))
+ON CONFLICT (name) DO UPDATE SET refreshed_at = excluded.refreshed_at
+""").bindparams(name=REFRESH_NAME)
+
+# полное построение в одной транзакции (миграция 9a4c6e2b8d17 выполняет свою копию этих запросов): запись в resumes блокируется
+# до конца построения, чтобы журнал и гистограмма сошлись; advisory-блокировка та же, что у обновления
+REBUILD_HISTOGRAM = [
+    select(func.pg_advisory_xact_lock(func.hashtext(REFRESH_NAME))),
+    text('LOCK TABLE resumes IN SHARE MODE'),
+    text('DELETE FROM resume_salary_changes'),
+    text('DELETE FROM resume_salary_histogram'),
+    text(f"""
+INSERT INTO resume_salary_histogram (workload, keyword, bucket, resumes_count, salary_sum)
+SELECT workload, keyword, salary / :bucket_width * :bucket_width, count(*), sum(salary)
+FROM resumes AS source {_KEYWORDS}
+WHERE salary IS NOT NULL
+GROUP BY 1, 2, 3
+""").bindparams(bucket_width=BUCKET_WIDTH),
+    _mark_refreshed,
+]
+
+analytics_router = APIRouter(prefix='/analytics')
+
+
+async def get_staleness(session: AsyncSession) -> tuple | None:
+    """Время последнего обновления аналитики и отставание в секундах по часам БД"""
+    query = (
+        select(
+            AnalyticsRefreshesOrm.refreshed_at,
+            extract('epoch', func.timezone('utc', func.now()) - AnalyticsRefreshesOrm.refreshed_at),
+        )
+        .filter_by(name=REFRESH_NAME)
+    )
+    return (await session.execute(query)).one_or_none()
+
+
+async def refresh_salary_histogram(session: AsyncSession) -> bool:
+    """
+    Инкрементальное обновление гистограммы.
+    Возвращает False, если обновление уже выполняет другой процесс или гистограмма ещё не построена.
+    """
+    locked = await session.scalar(select(func.pg_try_advisory_xact_lock(func.hashtext(REFRESH_NAME))))
+    if not locked or await session.get(AnalyticsRefreshesOrm, REFRESH_NAME) is None:
+        await session.rollback()
+        return False
+    await session.execute(_apply_changes, {'bucket_width': BUCKET_WIDTH})
+    await session.execute(text('DELETE FROM resume_salary_histogram WHERE resumes_count = 0'))
+    await session.execute(_mark_refreshed)
+    await session.commit()
+    return True
+
+
+async def rebuild_salary_histogram(session: AsyncSession):
+    """Полное построение гистограммы по таблице resumes"""
+    for statement in REBUILD_HISTOGRAM:
+        await session.execute(statement)
+    await session.commit()
+
+
+def histogram_percentile(buckets: list, total: int, q: float) -> int:
+    """Перцентиль с линейной интерполяцией внутри корзины"""
+    target = total * q / 100
+    cumulative = 0
+    for bucket in buckets:
+        if cumulative + bucket.resumes_count >= target:
+            return round(bucket.bucket + BUCKET_WIDTH * (target - cumulative) / bucket.resumes_count)
+        cumulative += bucket.resumes_count
+    return buckets[-1].bucket + BUCKET_WIDTH
+
+
+@analytics_router.get(
+    path='/salaries',
+    tags=['Аналитика'],
+    summary='Средняя зарплата, перцентили и гистограмма по типу занятости',
+    response_model=SalaryAnalyticsDTO
+)
+async def get_salary_analytics(
+    session: depends_session,
+    keyword: Annotated[str, Query(max_length=256, description='Слово из заголовка резюме')] = '',
+    max_staleness: Annotated[
+        float, Query(ge=0, description='Допустимое отставание данных, секунды')
+    ] = analytics_settings.MAX_STALENESS,
+):
+    state = await get_staleness(session)
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='Аналитика ещё не построена, повторите запрос позже'
+        )
+    if state[1] > max_staleness and await refresh_salary_histogram(session):
+        state = await get_staleness(session)
+    refreshed_at, staleness = state
+
+    keyword = keyword.strip().lower()
+    query = (
+        select(ResumeSalaryHistogramOrm)
+        .filter_by(keyword=keyword)
+        .filter(ResumeSalaryHistogramOrm.resumes_count > 0)
+        .order_by(ResumeSalaryHistogramOrm.workload, ResumeSalaryHistogramOrm.bucket)
+    )
+    rows = (await session.execute(query)).scalars().all()
+    workloads = []
+    for workload, buckets in groupby(rows, key=lambda row: row.workload):
+        buckets = list(buckets)
+        total = sum(bucket.resumes_count for bucket in buckets)
+        workloads.append({
+            'workload': workload,
+            'resumes_count': total,
+            'avg_salary': round(sum(bucket.salary_sum for bucket in buckets) / total),
+            **{f'p{q}_salary': histogram_percentile(buckets, total, q) for q in PERCENTILES},
+            'histogram': [
+                {
+                    'salary_from': bucket.bucket,
+                    'salary_to': bucket.bucket + BUCKET_WIDTH,
+                    'resumes_count': bucket.resumes_count,
+                }
+                for bucket in buckets
+            ],
+        })
+    return serialized_response(SalaryAnalyticsDTO, {
+        'keyword': keyword,
+        'refreshed_at': refreshed_at,
+        'staleness_seconds': round(float(staleness), 3),
+        'workloads': workloads,
+    })
+
+
+async def main():
+    async with session_factory() as session:
+        await rebuild_salary_histogram(session)
+    await engine.dispose()
+    logger.info(f'Гистограмма зарплат {REFRESH_NAME} построена')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
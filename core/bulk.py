@@ -0,0 +1,244 @@
+"""
+Массовая загрузка записей.
+Тело запроса принимается как JSON-массив или NDJSON (одна запись на строку), записи проверяются
+DTO-моделью и пишутся порциями через COPY (asyncpg copy_records_to_table). Если драйвер не умеет COPY,
+порция вставляется одним многострочным insert().values(). Если порция нарушает ограничение таблицы
+(например, ссылается на несуществующую запись), ответ - 409, если данные не подходят колонкам - 422;
+уже записанные порции откатываются вместе с транзакцией.
+Отклики на вакансии пишутся порциями одним INSERT ... SELECT FROM unnest(...) ON CONFLICT DO NOTHING:
+уже существующие пары (резюме, вакансия) пропускаются, а RETURNING показывает, сколько строк вставлено.
+"""
+from enum import Enum
+from functools import lru_cache
+from time import perf_counter
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import ARRAY, Integer, Table, Text, bindparam, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.declarative_models import VacanciesRepliesOrm
+from models.schemas import BulkBatchDTO, BulkIngestDTO, BulkRepliesBatchDTO, BulkRepliesDTO, VacanciesRepliesAddDTO
+
+DEFAULT_BULK_BATCH_SIZE = 5000
+MAX_BULK_BATCH_SIZE = 50000
+
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+
+
+# массивы передаются тремя параметрами, поэтому текст запроса не зависит от размера порции
+_replies_rows = func.unnest(
+    bindparam('resume_ids', type_=ARRAY(Integer)),
+    bindparam('vacancy_ids', type_=ARRAY(Integer)),
+    bindparam('cover_letters', type_=ARRAY(Text)),
+).table_valued('resume_id', 'vacancy_id', 'cover_letter').render_derived()
+# вставка в таблицу, а не в ORM-сущность: session.execute обрабатывает INSERT по сущности как ORM-вставку,
+# которая не поддерживает from_select с именами колонок; render_derived задаёт имена колонок unnest в FROM
+INSERT_REPLIES = (
+    pg_insert(VacanciesRepliesOrm.__table__)
+    .from_select(
+        ['resume_id', 'vacancy_id', 'cover_letter'],
+        select(_replies_rows.c.resume_id, _replies_rows.c.vacancy_id, _replies_rows.c.cover_letter)
+    )
+    .on_conflict_do_nothing(index_elements=['resume_id', 'vacancy_id'])
+    .returning(VacanciesRepliesOrm.resume_id)
+)
+
+
+@lru_cache
+def _list_adapter(dto: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[dto])
+
+
+def _validation_error(exc: ValidationError, *loc_prefix) -> RequestValidationError:
+    return RequestValidationError(
+        [{**error, 'loc': ('body', *loc_prefix, *error['loc'])} for error in exc.errors()]
+    )
+
+
+async def iter_items(request: Request, dto: type[BaseModel]) -> AsyncIterator[BaseModel]:
+    """Проверенные записи из тела запроса: NDJSON читается потоком, JSON-массив целиком"""
+    content_type = request.headers.get('content-type', '').split(';')[0].strip()
+    if content_type not in NDJSON_CONTENT_TYPES:
+        try:
+            items = _list_adapter(dto).validate_json(await request.body())
+        except ValidationError as exc:
+            raise _validation_error(exc)
+        for item in items:
+            yield item
+        return
+
+    line_no = 0
+    buffer = b''
+    async for part in request.stream():
+        buffer += part
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                try:
+                    yield dto.model_validate_json(line)
+                except ValidationError as exc:
+                    raise _validation_error(exc, line_no)
+    if buffer.strip():
+        try:
+            yield dto.model_validate_json(buffer)
+        except ValidationError as exc:
+            raise _validation_error(exc, line_no + 1)
+
+
+def _driver_error(exc: Exception) -> Exception:
+    """Исключение драйвера: у ошибок SQLAlchemy оно в orig, а у обёрток адаптера asyncpg - в __cause__"""
+    exc = getattr(exc, 'orig', exc)
+    return exc.__cause__ or exc
+
+
+def _error_status(exc: Exception) -> int | None:
+    """
+    Код ответа для ошибки записи порции: нарушение ограничения (SQLSTATE класса 23, например ссылка на
+    несуществующую запись) - 409, некорректные данные (класс 22) - 422, иначе None.
+    COPY идёт мимо SQLAlchemy, поэтому ошибка распознаётся по sqlstate исключения драйвера.
+    """
+    sqlstate = getattr(_driver_error(exc), 'sqlstate', None) or ''
+    return {'22': status.HTTP_422_UNPROCESSABLE_ENTITY, '23': status.HTTP_409_CONFLICT}.get(sqlstate[:2])
+
+
+async def begin_transaction(session: AsyncSession):
+    """
+    Начало транзакции на соединении сессии. Адаптер asyncpg в SQLAlchemy отправляет BEGIN только перед первым
+    своим запросом, а COPY идёт мимо адаптера - без этого каждая порция COPY фиксировалась бы сразу.
+    """
+    connection = await session.connection()
+    await connection.exec_driver_sql('SELECT 1')
+
+
+async def write_batch(session: AsyncSession, table: Table, columns: list[str], items: list[BaseModel]) -> str:
+    """Запись порции в таблицу, возвращает использованный способ: copy или insert"""
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    if hasattr(driver_connection, 'copy_records_to_table'):
+        records = [
+            tuple(
+                # Enum-колонки SQLAlchemy хранит по имени члена перечисления
+                value.name if isinstance(value, Enum) else value
+                for value in (getattr(item, column) for column in columns)
+            )
+            for item in items
+        ]
+        await driver_connection.copy_records_to_table(table.name, records=records, columns=columns)
+        return 'copy'
+    await session.execute(insert(table).values([item.model_dump() for item in items]))
+    return 'insert'
+
+
+async def bulk_ingest(
+        session: AsyncSession,
+        request: Request,
+        dto: type[BaseModel],
+        table: Table,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE
+) -> BulkIngestDTO:
+    """Загрузка всех записей тела запроса порциями по batch_size в рамках одной транзакции"""
+    columns = list(dto.model_fields)
+    started = perf_counter()
+    batches: list[BulkBatchDTO] = []
+    method = None
+    batch: list[BaseModel] = []
+    await begin_transaction(session)
+
+    async def flush():
+        nonlocal method, batch
+        batch_started = perf_counter()
+        try:
+            method = await write_batch(session, table, columns, batch)
+        except Exception as exc:
+            status_code = _error_status(exc)
+            if status_code is None:
+                raise
+            error = _driver_error(exc)
+            raise HTTPException(
+                status_code=status_code,
+                detail=f'Порция {len(batches) + 1} не записана в {table.name}: '
+                       f'{getattr(error, "detail", None) or getattr(error, "message", error)}'
+            )
+        batches.append(BulkBatchDTO(
+            batch=len(batches) + 1,
+            rows=len(batch),
+            elapsed_ms=round((perf_counter() - batch_started) * 1000, 3),
+        ))
+        batch = []
+
+    async for item in iter_items(request, dto):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    return BulkIngestDTO(
+        rows=sum(batch_report.rows for batch_report in batches),
+        method=method,
+        elapsed_ms=round((perf_counter() - started) * 1000, 3),
+        batches=batches,
+    )
+
+
+async def insert_replies(session: AsyncSession, replies: list[VacanciesRepliesAddDTO]) -> int:
+    """Вставка порции откликов одним запросом, возвращает число вставленных (не дублей)"""
+    result = await session.execute(INSERT_REPLIES, {
+        'resume_ids': [reply.resume_id for reply in replies],
+        'vacancy_ids': [reply.vacancy_id for reply in replies],
+        'cover_letters': [reply.cover_letter for reply in replies],
+    })
+    return len(result.all())
+
+
+async def bulk_insert_replies(
+        session: AsyncSession,
+        request: Request,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE
+) -> BulkRepliesDTO:
+    """Добавление всех откликов тела запроса порциями по batch_size в рамках одной транзакции"""
+    started = perf_counter()
+    batches: list[BulkRepliesBatchDTO] = []
+    batch: list[VacanciesRepliesAddDTO] = []
+
+    async def flush():
+        nonlocal batch
+        batch_started = perf_counter()
+        try:
+            inserted = await insert_replies(session, batch)
+        except IntegrityError:
+            # ON CONFLICT покрывает только дубли, ссылки на несуществующие записи - ошибка
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f'Порция {len(batches) + 1} ссылается на несуществующее резюме или вакансию'
+            )
+        batches.append(BulkRepliesBatchDTO(
+            batch=len(batches) + 1,
+            rows=len(batch),
+            inserted=inserted,
+            duplicates=len(batch) - inserted,
+            elapsed_ms=round((perf_counter() - batch_started) * 1000, 3),
+        ))
+        batch = []
+
+    async for item in iter_items(request, VacanciesRepliesAddDTO):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    return BulkRepliesDTO(
+        rows=sum(batch_report.rows for batch_report in batches),
+        inserted=sum(batch_report.inserted for batch_report in batches),
+        duplicates=sum(batch_report.duplicates for batch_report in batches),
+        elapsed_ms=round((perf_counter() - started) * 1000, 3),
+        batches=batches,
+    )
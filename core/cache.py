@@ -0,0 +1,145 @@
+"""
+Кэш сериализованных ответов в памяти процесса.
+Записи вытесняются по LRU при превышении размера и устаревают по TTL. Между процессами uvicorn
+инвалидация распространяется через LISTEN/NOTIFY: триггер на resumes публикует ID изменённого
+или удалённого резюме, а каждый процесс слушает канал и удаляет запись из своего кэша.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from time import monotonic
+from typing import Hashable, NamedTuple
+
+from config import cache_settings
+from databases_queries import engine
+from models.declarative_models import RESUMES_CHANGED_CHANNEL
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+logger.addHandler(logging.StreamHandler())
+
+LISTENER_RECONNECT_DELAY = 5
+
+
+class CachedResponse(NamedTuple):
+    """Тело ответа и его заголовки (ETag, Last-Modified)"""
+    content: bytes
+    headers: dict[str, str]
+
+
+class ResponseCache:
+    """LRU/TTL-кэш сериализованных ответов"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, CachedResponse]] = OrderedDict()
+        # увеличивается при каждой инвалидации, чтобы не положить в кэш ответ,
+        # прочитанный из БД до пришедшего уведомления
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, payload = entry
+        if expires_at < monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def set(self, key: Hashable, payload: CachedResponse, generation: int | None = None):
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (monotonic() + self.ttl, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        self.generation += 1
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
+
+
+class CacheInvalidationListener:
+    """Подписка на канал NOTIFY с удалением изменённых записей из кэша"""
+
+    def __init__(self, cache: ResponseCache, channel: str):
+        self.cache = cache
+        self.channel = channel
+        self._task: asyncio.Task | None = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            self.cache.invalidate(int(payload))
+        except ValueError:
+            self.cache.clear()
+
+    async def _listen(self):
+        while True:
+            try:
+                async with engine.connect() as connection:
+                    raw_connection = await connection.get_raw_connection()
+                    driver_connection = raw_connection.driver_connection
+                    terminated = asyncio.Event()
+                    driver_connection.add_termination_listener(lambda _: terminated.set())
+                    await driver_connection.add_listener(self.channel, self._on_notify)
+                    # пока подписки не было, уведомления могли быть пропущены
+                    self.cache.clear()
+                    try:
+                        await terminated.wait()
+                    finally:
+                        if not driver_connection.is_closed():
+                            await driver_connection.remove_listener(self.channel, self._on_notify)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f'Ошибка подписки на канал {self.channel}')
+            self.cache.clear()
+            await asyncio.sleep(LISTENER_RECONNECT_DELAY)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+resumes_cache = ResponseCache(max_size=cache_settings.RESUMES_MAX_SIZE, ttl=cache_settings.RESUMES_TTL)
+resumes_cache_listener = CacheInvalidationListener(resumes_cache, RESUMES_CHANGED_CHANNEL)
@@ -0,0 +1,60 @@
+"""
+Условные GET-запросы (ETag / Last-Modified).
+Валидаторы ответа строятся из ID и updated_at записи (для страниц - из границ страницы, числа записей
+и max(updated_at)). У страниц есть только ETag: max(updated_at) не меняется при удалении записи, поэтому
+Last-Modified для них не отдаётся. Если клиент прислал If-None-Match с тем же ETag или If-Modified-Since не раньше
+Last-Modified, отвечаем 304 без тела. If-None-Match имеет приоритет над If-Modified-Since (RFC 9110).
+updated_at меняется только у самих резюме: изменения связанных записей (работника, откликов)
+валидаторы не меняют, поэтому страницы со связями (?include=) отдаются без них.
+"""
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, status
+from fastapi.responses import Response
+
+
+def make_etag(*parts) -> str:
+    """Сильный ETag из значений, однозначно определяющих версию ответа"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def validator_headers(etag: str, last_modified: datetime.datetime | None) -> dict[str, str]:
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        # updated_at хранится в UTC без часового пояса
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=datetime.timezone.utc)
+        headers['Last-Modified'] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == '*':
+        return True
+    # для If-None-Match используется слабое сравнение: префикс W/ не учитывается
+    candidates = {candidate.strip().removeprefix('W/') for candidate in if_none_match.split(',')}
+    return etag.removeprefix('W/') in candidates
+
+
+def is_not_modified(request: Request, headers: dict[str, str]) -> bool:
+    """Можно ли ответить 304 на запрос с данными валидаторами ответа"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, headers['ETag'])
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is None or 'Last-Modified' not in headers:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return parsedate_to_datetime(headers['Last-Modified']) <= since
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -1,13 +1,30 @@
 import logging
-from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload, joinedload, load_only
+from typing import Annotated
 
-from databases_queries import depends_session
+from fastapi import HTTPException, Path, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from core.bulk import bulk_ingest, bulk_insert_replies, DEFAULT_BULK_BATCH_SIZE, MAX_BULK_BATCH_SIZE
+from core.cache import CachedResponse, resumes_cache
+from core.conditional import is_not_modified, make_etag, not_modified_response, validator_headers
+from core.export import stream_resumes_ndjson, DEFAULT_EXPORT_CHUNK_SIZE, MAX_EXPORT_CHUNK_SIZE
+from core.fields import (
+    RESUMES_FIELDS, RESUMES_INCLUDE, WORKERS_FIELDS, WORKERS_INCLUDE, depends_resumes_fields, depends_resumes_include,
+    depends_workers_fields, depends_workers_include, trimmed_schema
+)
+from core.instrumentation import query_budget
+from core.loaders import resumes_loader
+from core.pagination import MAX_ID, MIN_ID, depends_page, approximate_count
+from core.search import search_by_title, SEARCH_QUERY_MIN_LENGTH
+from core.serialization import JSONBytesResponse, serialize, serialized_response
+from core.statements import RESUMES_PAGE_VERSION, resumes_page, workers_page
+from databases_queries import depends_session, depends_read_session
 from fastapi import APIRouter
 
 from models.declarative_models import WorkersOrm, ResumesOrm, VacanciesOrm
-from models.schemas import WorkersAddDTO, M2MResumesVacanciesDTO, WorkersRelDTO, ResumesDTO, WorkersDTO
+from models.schemas import (
+    WorkersAddDTO, ResumesDTO, WorkersDTO, PageDTO, ResumesAddDTO, BulkIngestDTO, VacanciesDTO, BulkRepliesDTO
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -19,38 +36,106 @@ core_router = APIRouter()
 @core_router.get(
     path='/workers',
     tags=['Работники'],
-    summary='Получение списка работников'
+    summary='Получение списка работников',
+    response_model=PageDTO[WorkersDTO]
 )
-async def get_workers(session: depends_session):
-    query = (
-        select(WorkersOrm)
-        .options(
-            load_only(WorkersOrm.id, WorkersOrm.username),
-            selectinload(WorkersOrm.resumes)
-        )
-        .limit(3)
-    )
-    res = await session.execute(query)
+@query_budget(5)
+async def get_workers(
+    session: depends_read_session,
+    page: depends_page,
+    fields: depends_workers_fields,
+    include: depends_workers_include
+):
+    res = await session.execute(workers_page(fields, include), page.query_params())
     result_orm = res.scalars().all()
-    response = [WorkersRelDTO.model_validate(row, from_attributes=True) for row in result_orm]
+    schema = trimmed_schema(WORKERS_INCLUDE.schema(include), WORKERS_FIELDS.omitted(fields))
+    response = serialized_response(PageDTO[schema], {
+        'items': result_orm[:page.limit],
+        'next_cursor': page.next_cursor(result_orm),
+        'approximate_total': await approximate_count(session, WorkersOrm.__tablename__) if page.with_total else None,
+    })
     return response
 
 
 @core_router.get(
     path='/resumes',
     tags=['Работники'],
-    summary='Получение списка резюме'
+    summary='Получение списка резюме',
+    response_model=PageDTO[ResumesDTO]
 )
-async def get_resumes(session: depends_session):
-    query = (
-        select(ResumesOrm)
-        .options(joinedload(ResumesOrm.worker))
-        .options(selectinload(ResumesOrm.vacancies_replied).load_only(VacanciesOrm.title))
-    )
-    res = await session.execute(query)
+@query_budget(4)
+async def get_resumes(
+    request: Request,
+    session: depends_read_session,
+    page: depends_page,
+    fields: depends_resumes_fields,
+    include: depends_resumes_include
+):
+    approximate_total = await approximate_count(session, ResumesOrm.__tablename__) if page.with_total else None
+    headers = None
+    # версия страницы строится только по самим резюме: изменения связей include (работника, откликов) её не
+    # меняют, поэтому для ответов со связями условные запросы не поддерживаются
+    if not include:
+        # сначала дешёвый запрос версии страницы: при совпадении ETag страница не загружается.
+        # Last-Modified не отдаётся: удаление записи страницы не сдвигает max(updated_at), и If-Modified-Since
+        # вернул бы 304 после удаления; удаление меняет число записей или границы страницы, а с ними ETag
+        count, max_id, max_updated_at = (await session.execute(RESUMES_PAGE_VERSION, page.query_params())).one()
+        headers = validator_headers(
+            make_etag('resumes', fields, page.after_id, page.limit, count, max_id, max_updated_at, approximate_total),
+            None
+        )
+        if is_not_modified(request, headers):
+            return not_modified_response(headers)
+
+    res = await session.execute(resumes_page(fields, include), page.query_params())
     result_orm = res.unique().scalars().all()
-    result_dto = [M2MResumesVacanciesDTO.model_validate(row, from_attributes=True) for row in result_orm]
-    return result_dto
+    schema = trimmed_schema(RESUMES_INCLUDE.schema(include), RESUMES_FIELDS.omitted(fields))
+    response = serialized_response(PageDTO[schema], {
+        'items': result_orm[:page.limit],
+        'next_cursor': page.next_cursor(result_orm),
+        'approximate_total': approximate_total,
+    }, headers=headers)
+    return response
+
+
+@core_router.get(
+    path='/resumes/export',
+    tags=['Работники'],
+    summary='Потоковая выгрузка всех резюме в формате NDJSON',
+    response_class=StreamingResponse
+)
+async def export_resumes(
+    chunk_size: Annotated[int, Query(ge=1, le=MAX_EXPORT_CHUNK_SIZE)] = DEFAULT_EXPORT_CHUNK_SIZE
+):
+    return StreamingResponse(stream_resumes_ndjson(chunk_size), media_type='application/x-ndjson')
+
+
+@core_router.get(
+    path='/resumes/search',
+    tags=['Работники'],
+    summary='Поиск резюме по заголовку',
+    response_model=PageDTO[ResumesDTO]
+)
+async def search_resumes(
+    q: Annotated[str, Query(min_length=SEARCH_QUERY_MIN_LENGTH, max_length=256)],
+    session: depends_read_session,
+    page: depends_page
+):
+    return serialized_response(PageDTO[ResumesDTO], await search_by_title(session, ResumesOrm, q, page))
+
+
+@core_router.get(
+    path='/vacancies/search',
+    tags=['Вакансии'],
+    summary='Поиск вакансий по заголовку',
+    response_model=PageDTO[VacanciesDTO]
+)
+async def search_vacancies(
+    q: Annotated[str, Query(min_length=SEARCH_QUERY_MIN_LENGTH, max_length=256)],
+    session: depends_read_session,
+    page: depends_page
+):
+    return serialized_response(PageDTO[VacanciesDTO], await search_by_title(session, VacanciesOrm, q, page))
 
 
 @core_router.post(
@@ -70,14 +155,81 @@ async def create_worker(data: WorkersAddDTO, session: depends_session):
     return 'OK'
 
 
+@core_router.post(
+    path='/workers/bulk',
+    tags=['Работники'],
+    summary='Массовое добавление работников (JSON-массив или NDJSON)',
+    status_code=status.HTTP_201_CREATED
+)
+async def create_workers_bulk(
+    request: Request,
+    session: depends_session,
+    batch_size: Annotated[int, Query(ge=1, le=MAX_BULK_BATCH_SIZE)] = DEFAULT_BULK_BATCH_SIZE
+) -> BulkIngestDTO:
+    report = await bulk_ingest(session, request, WorkersAddDTO, WorkersOrm.__table__, batch_size)
+    await session.commit()
+    logger.debug(f'Загружено работников: {report.rows} за {report.elapsed_ms} мс')
+    return report
+
+
+@core_router.post(
+    path='/resumes/bulk',
+    tags=['Работники'],
+    summary='Массовое добавление резюме (JSON-массив или NDJSON)',
+    status_code=status.HTTP_201_CREATED
+)
+async def create_resumes_bulk(
+    request: Request,
+    session: depends_session,
+    batch_size: Annotated[int, Query(ge=1, le=MAX_BULK_BATCH_SIZE)] = DEFAULT_BULK_BATCH_SIZE
+) -> BulkIngestDTO:
+    report = await bulk_ingest(session, request, ResumesAddDTO, ResumesOrm.__table__, batch_size)
+    await session.commit()
+    logger.debug(f'Загружено резюме: {report.rows} за {report.elapsed_ms} мс')
+    return report
+
+
+@core_router.post(
+    path='/vacancies/replies/bulk',
+    tags=['Вакансии'],
+    summary='Массовое добавление откликов на вакансии (JSON-массив или NDJSON)',
+    status_code=status.HTTP_201_CREATED
+)
+async def create_replies_bulk(
+    request: Request,
+    session: depends_session,
+    batch_size: Annotated[int, Query(ge=1, le=MAX_BULK_BATCH_SIZE)] = DEFAULT_BULK_BATCH_SIZE
+) -> BulkRepliesDTO:
+    report = await bulk_insert_replies(session, request, batch_size)
+    await session.commit()
+    logger.debug(f'Добавлено откликов: {report.inserted}, дублей пропущено: {report.duplicates}')
+    return report
+
+
 @core_router.get(
     path='/resumes/{resume_id}',
     tags=['Работники'],
-    summary='Получение резюме по идентификатору'
+    summary='Получение резюме по идентификатору',
+    response_model=ResumesDTO
 )
-async def get_resume(resume_id: int, session: depends_session):
-    result = await session.get(entity=ResumesOrm, ident=resume_id)
-    if not result:
-        raise HTTPException(status_code=404, detail=f"Резюме с идентификатором {resume_id} не найдено")
-    response = ResumesDTO.model_validate(result, from_attributes=True)
-    return response
+async def get_resume(
+    # ID вне диапазона integer не закодировать в пакетный запрос загрузчика: он провалил бы весь пакет
+    resume_id: Annotated[int, Path(ge=MIN_ID, le=MAX_ID)],
+    request: Request
+):
+    cached = resumes_cache.get(resume_id)
+    if cached is None:
+        generation = resumes_cache.generation
+        # кэш инвалидирует NOTIFY основного сервера: ответ, прочитанный с отстающей реплики после уведомления,
+        # остался бы в кэше до истечения TTL, поэтому промахи читаются с основного сервера
+        result = await resumes_loader.load(resume_id)
+        if not result:
+            raise HTTPException(status_code=404, detail=f"Резюме с идентификатором {resume_id} не найдено")
+        cached = CachedResponse(
+            content=serialize(ResumesDTO, result),
+            headers=validator_headers(make_etag('resume', result.id, result.updated_at), result.updated_at)
+        )
+        resumes_cache.set(resume_id, cached, generation)
+    if is_not_modified(request, cached.headers):
+        return not_modified_response(cached.headers)
+    return JSONBytesResponse(content=cached.content, headers=cached.headers)
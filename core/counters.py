@@ -0,0 +1,83 @@
+"""
+Проверка и исправление денормализованных счётчиков (workers.resume_count, vacancies.reply_count).
+Счётчики поддерживают триггеры, но они расходятся с реальным числом строк, если триггеры были
+отключены (например, при загрузке данных через COPY) или данные менялись в обход них.
+Проверка сравнивает каждый счётчик с COUNT по таблице-источнику и выводит расхождения,
+--repair пересчитывает разошедшиеся значения. Код выхода 1 - найдены расхождения и не исправлены.
+
+python -m core.counters [--repair] [--sample 10]
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from databases_queries import engine
+from models.declarative_models import COUNTERS
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+logger.addHandler(logging.StreamHandler())
+
+
+def drift_query(table: str, column: str, source: str, key: str) -> str:
+    """Строки table, у которых счётчик не равен числу строк source"""
+    return f"""
+        SELECT {table}.id, {table}.{column} AS stored, coalesce(actual.n, 0) AS actual
+        FROM {table}
+        LEFT JOIN (SELECT {key}, count(*) AS n FROM {source} GROUP BY {key}) AS actual
+            ON actual.{key} = {table}.id
+        WHERE {table}.{column} <> coalesce(actual.n, 0)
+    """
+
+
+async def find_drift(conn: AsyncConnection, table: str, column: str, source: str, key: str,
+                     sample: int = 10) -> tuple[int, list]:
+    """Число разошедшихся строк и первые sample из них"""
+    query = drift_query(table, column, source, key)
+    total = (await conn.execute(text(f'SELECT count(*) FROM ({query}) AS drift'))).scalar_one()
+    examples = (await conn.execute(text(f'{query} ORDER BY {table}.id LIMIT :sample'), {'sample': sample})).all()
+    return total, examples
+
+
+async def repair(conn: AsyncConnection, table: str, column: str, source: str, key: str) -> int:
+    """Пересчёт разошедшихся счётчиков, возвращает число исправленных строк"""
+    # запись в source блокируется до конца транзакции, иначе пересчёт разойдётся с параллельными изменениями
+    await conn.execute(text(f'LOCK TABLE {source} IN SHARE MODE'))
+    result = await conn.execute(text(f"""
+        UPDATE {table} SET {column} = drift.actual
+        FROM ({drift_query(table, column, source, key)}) AS drift
+        WHERE {table}.id = drift.id
+    """))
+    return result.rowcount
+
+
+async def repair_all(conn: AsyncConnection) -> dict[str, int]:
+    return {f'{table}.{column}': await repair(conn, table, column, source, key)
+            for table, column, source, key in COUNTERS}
+
+
+async def main(fix: bool, sample: int) -> int:
+    drifted = 0
+    async with engine.begin() as conn:
+        for table, column, source, key in COUNTERS:
+            total, examples = await find_drift(conn, table, column, source, key, sample)
+            logger.info(f'{table}.{column}: расхождений {total}')
+            for row in examples:
+                logger.info(f'  id={row.id}: хранится {row.stored}, на самом деле {row.actual}')
+            if total and fix:
+                logger.info(f'{table}.{column}: исправлено {await repair(conn, table, column, source, key)}')
+            elif total:
+                drifted += total
+    await engine.dispose()
+    return 1 if drifted else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Проверка денормализованных счётчиков')
+    parser.add_argument('--repair', action='store_true', help='Пересчитать разошедшиеся счётчики')
+    parser.add_argument('--sample', type=int, default=10, help='Сколько расхождений вывести для каждого счётчика')
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(main(args.repair, args.sample)))
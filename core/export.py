@@ -0,0 +1,36 @@
+"""
+Потоковая выгрузка резюме в формате NDJSON.
+Строки читаются серверным курсором порциями по yield_per, связи подгружаются отдельным
+selectin-запросом на каждую порцию, поэтому потребление памяти не зависит от размера таблицы.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from core.serialization import serialize
+from databases_queries import read_session
+from models.declarative_models import ResumesOrm, VacanciesOrm
+from models.schemas import M2MResumesVacanciesDTO
+
+DEFAULT_EXPORT_CHUNK_SIZE = 1000
+MAX_EXPORT_CHUNK_SIZE = 10000
+
+
+async def stream_resumes_ndjson(chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE):
+    """Генератор NDJSON-порций: одна порция на каждые chunk_size резюме"""
+    query = (
+        select(ResumesOrm)
+        .options(selectinload(ResumesOrm.worker))
+        .options(selectinload(ResumesOrm.vacancies_replied).load_only(VacanciesOrm.title))
+        .order_by(ResumesOrm.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    # собственная сессия: генератор выполняется уже после выхода из обработчика запроса
+    async with read_session() as session:
+        result = await session.stream(query)
+        async for chunk in result.scalars().partitions():
+            yield b''.join(
+                serialize(M2MResumesVacanciesDTO, row) + b'\n'
+                for row in chunk
+            )
+            # выгруженные объекты больше не нужны, не держим их в identity map
+            session.expunge_all()
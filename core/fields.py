@@ -0,0 +1,123 @@
+"""
+Форма ответов списков: выборочные поля (sparse fieldsets) и связи по запросу.
+Параметр ?fields=id,title ограничивает колонки основной сущности: запрос загружает только их (load_only),
+а ответ сериализуется урезанной моделью без остальных колонок.
+Параметр ?include=worker,vacancies перечисляет связи, которые нужно загрузить и вложить в ответ; по умолчанию
+отдаются только сами записи, и клиенты, которым связи не нужны, не платят за лишние запросы.
+Модели ответов, как и запросы в core.statements, строятся один раз на набор полей и связей.
+"""
+from functools import lru_cache
+from typing import Annotated, Any
+
+from fastapi import Depends, HTTPException, Query, status
+from pydantic import BaseModel, create_model
+from sqlalchemy import inspect
+
+from models.declarative_models import ResumesOrm, WorkersOrm
+from models.schemas import (
+    M2MResumesVacanciesDTO, ResumesDTO, ResumesRelDTO, VacanciesWithoutCompensationDTO, WorkersDTO, WorkersRelDTO
+)
+
+
+def parse_names(value: str, allowed: tuple[str, ...], kind: str) -> tuple[str, ...]:
+    """Имена через запятую из allowed в порядке allowed; kind - что перечислено, для текста ошибки"""
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested.difference(allowed)
+    if not requested:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f'Не указано ни одного значения {kind}')
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Недопустимые значения {kind}: {", ".join(sorted(unknown))}. Допустимые: {", ".join(allowed)}'
+        )
+    return tuple(name for name in allowed if name in requested)
+
+
+class FieldsParams:
+    """Параметр fields для списка entity с моделью ответа schema: допустимы колонки entity, которые есть в schema"""
+
+    def __init__(self, entity, schema: type[BaseModel]):
+        columns = {attribute.key for attribute in inspect(entity).column_attrs}
+        self.allowed = tuple(name for name in schema.model_fields if name in columns)
+
+    def __call__(
+        self,
+        fields: Annotated[str | None, Query(description='Колонки через запятую, по умолчанию все')] = None,
+    ) -> tuple[str, ...]:
+        """Запрошенные колонки в порядке модели ответа, пустой кортеж - все колонки"""
+        return () if fields is None else parse_names(fields, self.allowed, 'fields')
+
+    def omitted(self, columns: tuple[str, ...]) -> tuple[str, ...]:
+        """Колонки, которых не будет в ответе"""
+        return tuple(name for name in self.allowed if columns and name not in columns)
+
+
+class IncludeParams:
+    """
+    Параметр include для списка с моделью ответа base.
+    relations: имя в include -> (поле модели ответа, его тип); variants - готовые DTO для наборов связей,
+    для остальных наборов модель создаётся от base при первом запросе.
+    """
+
+    def __init__(self, base: type[BaseModel], relations: dict[str, tuple[str, Any]],
+                 variants: dict[tuple[str, ...], type[BaseModel]]):
+        self.base = base
+        self.relations = relations
+        self.allowed = tuple(relations)
+        self._schemas = {(): base, **variants}
+
+    def __call__(
+        self,
+        include: Annotated[str | None, Query(description='Связи через запятую, по умолчанию без связей')] = None,
+    ) -> tuple[str, ...]:
+        """Запрошенные связи в порядке relations, пустой кортеж - без связей"""
+        return () if include is None else parse_names(include, self.allowed, 'include')
+
+    def schema(self, include: tuple[str, ...]) -> type[BaseModel]:
+        """Модель записи со связями include"""
+        if include not in self._schemas:
+            self._schemas[include] = create_model(
+                f'{self.base.__name__}Include',
+                __base__=self.base,
+                **{field: (annotation, ...) for field, annotation in (self.relations[name] for name in include)}
+            )
+        return self._schemas[include]
+
+
+@lru_cache
+def trimmed_schema(schema: type[BaseModel], omitted: tuple[str, ...]) -> type[BaseModel]:
+    """Модель schema без полей omitted"""
+    if not omitted:
+        return schema
+    return create_model(
+        f'{schema.__name__}Fields',
+        **{name: (field.annotation, field) for name, field in schema.model_fields.items() if name not in omitted}
+    )
+
+
+WORKERS_FIELDS = FieldsParams(WorkersOrm, WorkersDTO)
+RESUMES_FIELDS = FieldsParams(ResumesOrm, ResumesDTO)
+
+# имена совпадают с ключами WORKERS_RELATIONS и RESUMES_RELATIONS в core.statements
+WORKERS_INCLUDE = IncludeParams(
+    WorkersDTO,
+    relations={
+        'resumes': ('resumes', list[ResumesDTO]),
+        'resumes_parttime': ('resumes_parttime', list[ResumesDTO]),
+        'resumes_fulltime': ('resumes_fulltime', list[ResumesDTO]),
+    },
+    variants={('resumes',): WorkersRelDTO},
+)
+RESUMES_INCLUDE = IncludeParams(
+    ResumesDTO,
+    relations={
+        'worker': ('worker', WorkersDTO),
+        'vacancies': ('vacancies_replied', list[VacanciesWithoutCompensationDTO]),
+    },
+    variants={('worker',): ResumesRelDTO, ('worker', 'vacancies'): M2MResumesVacanciesDTO},
+)
+
+depends_workers_fields = Annotated[tuple[str, ...], Depends(WORKERS_FIELDS)]
+depends_resumes_fields = Annotated[tuple[str, ...], Depends(RESUMES_FIELDS)]
+depends_workers_include = Annotated[tuple[str, ...], Depends(WORKERS_INCLUDE)]
+depends_resumes_include = Annotated[tuple[str, ...], Depends(RESUMES_INCLUDE)]
@@ -0,0 +1,115 @@
+"""
+Учёт SQL-запросов в рамках HTTP-запроса.
+События before/after_cursor_execute движков считают число запросов и время в БД для текущего
+запроса (через ContextVar). Middleware отдаёт итоги в заголовке Server-Timing, предупреждает о
+повторяющихся запросах одного вида (ленивые загрузки мимо selectinload/joinedload) и о превышении
+бюджета запросов маршрута. В строгом режиме превышение бюджета - ошибка (для тестов).
+"""
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import database_settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+logger.addHandler(logging.StreamHandler())
+
+
+class QueryBudgetExceeded(Exception):
+    """Маршрут выполнил больше SQL-запросов, чем разрешено бюджетом"""
+
+
+class QueryStats:
+    """SQL-запросы, выполненные при обработке одного HTTP-запроса"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """Запросы одного вида, выполненные не менее threshold раз"""
+        return {statement: count for statement, count in self.shapes.items() if count >= threshold}
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar('current_query_stats', default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # время начала хранится в контексте выполнения: он живёт один запрос, поэтому после ошибки
+    # на соединении не остаётся незакрытых отметок
+    if _current_stats.get() is not None and context is not None:
+        context.query_started = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started = getattr(context, 'query_started', None)
+    if stats is None or started is None:
+        return
+    stats.duration += perf_counter() - started
+    stats.count += 1
+    # параметры передаются отдельно, поэтому текст запроса и есть его «форма»
+    stats.shapes[statement] += 1
+
+
+def instrument_engine(engine: AsyncEngine):
+    event.listen(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def query_budget(max_queries: int):
+    """Бюджет SQL-запросов для обработчика маршрута"""
+    def decorator(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorator
+
+
+class SQLInstrumentationMiddleware:
+    """ASGI middleware: статистика SQL-запросов и заголовок Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _check(self, scope, stats: QueryStats):
+        route = scope.get('route')
+        path = getattr(route, 'path', scope['path'])
+        for statement, count in stats.repeated(database_settings.REPEATED_QUERY_THRESHOLD).items():
+            logger.warning(f'{path}: одинаковых запросов - {count}, возможна проблема N+1: {statement[:200]}')
+        budget = getattr(scope.get('endpoint'), 'query_budget', database_settings.QUERY_BUDGET)
+        if budget and stats.count > budget:
+            message = f'{path}: SQL-запросов - {stats.count} при бюджете {budget}'
+            if database_settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = perf_counter()
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                self._check(scope, stats)
+                repeated = len(stats.repeated(database_settings.REPEATED_QUERY_THRESHOLD))
+                server_timing = (
+                    f'db;dur={stats.duration * 1000:.3f};desc="{stats.count} queries, {repeated} repeated", '
+                    f'app;dur={(perf_counter() - started) * 1000:.3f}'
+                )
+                message['headers'] = [*message.get('headers', []), (b'server-timing', server_timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
@@ -0,0 +1,49 @@
+"""
+Служебные эндпоинты для наблюдения за работой приложения
+"""
+from fastapi import APIRouter
+
+from core.cache import resumes_cache
+from core.singleflight import single_flight
+from databases_queries import engine, replica_engines, replica_router
+
+internal_router = APIRouter(prefix='/internal')
+
+
+@internal_router.get(
+    path='/cache',
+    tags=['Служебное'],
+    summary='Статистика кэша ответов'
+)
+async def get_cache_stats():
+    return {
+        'resumes': resumes_cache.stats(),
+    }
+
+
+@internal_router.get(
+    path='/pool',
+    tags=['Служебное'],
+    summary='Состояние пула соединений с БД'
+)
+async def get_pool_stats():
+    return {
+        'primary': engine.pool.stats(),
+        'replicas': [
+            {
+                'url': replica_engine.url.render_as_string(),
+                'healthy': replica_router.is_healthy(replica_engine),
+                **replica_engine.pool.stats(),
+            }
+            for replica_engine in replica_engines
+        ],
+    }
+
+
+@internal_router.get(
+    path='/single-flight',
+    tags=['Служебное'],
+    summary='Статистика объединения одинаковых запросов'
+)
+async def get_single_flight_stats():
+    return single_flight.stats()
@@ -0,0 +1,70 @@
+"""
+Пакетная загрузка записей по ID (в духе DataLoader).
+ID, запрошенные в одном такте цикла событий (в том числе разными параллельными HTTP-запросами),
+собираются вместе и загружаются одним запросом `WHERE id = ANY(:ids)` на тип записи. Число обращений
+к БД растёт с числом типов записей, а не с числом запросов.
+Загруженные объекты отсоединены от сессии и общие для всех ожидающих - их можно только читать.
+Результаты не кэшируются дольше одного пакета.
+Запрос пакета не относится ни к одному HTTP-запросу, поэтому не учитывается в их статистике и бюджете SQL-запросов.
+"""
+import asyncio
+import contextvars
+
+from sqlalchemy import ARRAY, Integer, any_, bindparam, select
+
+from databases_queries import read_session
+from models.declarative_models import ResumesOrm
+
+MAX_BATCH_SIZE = 1000
+
+
+class BatchLoader:
+    """Загрузчик записей entity по ID, объединяющий запросы одного такта"""
+
+    def __init__(self, entity, prefer_primary: bool = False):
+        self.entity = entity
+        self.prefer_primary = prefer_primary
+        self.query = select(entity).filter(entity.id == any_(bindparam('ids', type_=ARRAY(Integer))))
+        self._pending: dict[int, list[asyncio.Future]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, ident: int):
+        """Запись с данным ID или None"""
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            # пакет отправляется через два шага цикла, чтобы задачи, созданные в этом такте
+            # (например, через gather), успели добавить свои ID; запрос пакета не относится
+            # ни к одному HTTP-запросу, поэтому выполняется в пустом контексте
+            loop.call_soon(loop.call_soon, self._dispatch, context=contextvars.Context())
+        future = loop.create_future()
+        self._pending.setdefault(ident, []).append(future)
+        return await future
+
+    def _dispatch(self):
+        batch, self._pending = self._pending, {}
+        idents = list(batch)
+        for start in range(0, len(idents), MAX_BATCH_SIZE):
+            chunk = {ident: batch[ident] for ident in idents[start:start + MAX_BATCH_SIZE]}
+            task = asyncio.create_task(self._resolve(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, batch: dict[int, list[asyncio.Future]]):
+        try:
+            async with read_session(prefer_primary=self.prefer_primary) as session:
+                rows = (await session.execute(self.query, {'ids': list(batch)})).scalars().all()
+        except Exception as exc:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+        found = {row.id: row for row in rows}
+        for ident, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(found.get(ident))
+
+
+# резюме кэшируются и инвалидируются уведомлениями основного сервера, поэтому читаются с него
+resumes_loader = BatchLoader(ResumesOrm, prefer_primary=True)
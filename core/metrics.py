@@ -0,0 +1,117 @@
+"""
+Метрики приложения в формате Prometheus.
+Счётчики и гистограммы запросов по шаблону маршрута, число запросов в обработке, состояние пулов
+соединений и время сериализации ответов. При запуске нескольких процессов uvicorn нужно задать
+переменную окружения PROMETHEUS_MULTIPROC_DIR (пустой каталог, общий для процессов) - тогда
+/metrics собирает значения всех процессов.
+"""
+import os
+from time import perf_counter
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from starlette.routing import Match
+
+from databases_queries import engine, replica_engines
+
+REQUESTS = Counter(
+    'http_requests_total', 'Число обработанных HTTP-запросов', ['method', 'route', 'status']
+)
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Время обработки HTTP-запроса', ['method', 'route'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Число HTTP-запросов в обработке', ['method', 'route'],
+    multiprocess_mode='livesum',
+)
+REQUESTS_COALESCED = Counter(
+    'http_requests_coalesced_total', 'Число запросов, получивших ответ одинакового выполняющегося запроса', ['route']
+)
+SERIALIZATION_DURATION = Histogram(
+    'response_serialization_seconds', 'Время проверки и сериализации ответа', ['schema'],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections', 'Соединения пула по состоянию', ['engine', 'state'],
+    multiprocess_mode='livesum',
+)
+
+UNMATCHED_ROUTE = 'unmatched'
+
+metrics_router = APIRouter()
+
+
+def observe_serialization(schema, started: float):
+    SERIALIZATION_DURATION.labels(schema=getattr(schema, '__name__', str(schema))).observe(perf_counter() - started)
+
+
+def update_pool_metrics():
+    """Состояние пулов соединений текущего процесса"""
+    engines = {'primary': engine, **{f'replica_{index}': replica for index, replica in enumerate(replica_engines)}}
+    for name, pool_engine in engines.items():
+        stats = pool_engine.pool.stats()
+        for state in ('checked_out', 'idle', 'overflow'):
+            DB_POOL_CONNECTIONS.labels(engine=name, state=state).set(stats[state])
+
+
+def mark_process_dead():
+    """Удаление значений livesum-метрик завершающегося процесса из общего каталога"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class PrometheusMiddleware:
+    """ASGI middleware: метрики HTTP-запросов с меткой шаблона маршрута"""
+
+    def __init__(self, app, routes: list):
+        self.app = app
+        self.routes = routes
+
+    def _route_path(self, scope) -> str:
+        # маршрут определяется заранее, чтобы учитывать запрос в http_requests_in_flight
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return UNMATCHED_ROUTE
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        route = self._route_path(scope)
+        response_status = 500
+        in_flight = REQUESTS_IN_FLIGHT.labels(method=method, route=route)
+        in_flight.inc()
+        started = perf_counter()
+
+        async def send_with_status(message):
+            nonlocal response_status
+            if message['type'] == 'http.response.start':
+                response_status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            REQUEST_DURATION.labels(method=method, route=route).observe(perf_counter() - started)
+            REQUESTS.labels(method=method, route=route, status=response_status).inc()
+            update_pool_metrics()
+
+
+@metrics_router.get(path='/metrics', include_in_schema=False)
+async def get_metrics():
+    update_pool_metrics()
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
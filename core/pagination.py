@@ -0,0 +1,86 @@
+"""
+Курсорная (keyset) пагинация по первичному ключу.
+Вместо OFFSET клиент получает непрозрачный курсор, в котором закодирован последний отданный ID,
+поэтому каждая следующая страница читается по индексу первичного ключа за одно и то же время.
+"""
+import base64
+import json
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Query, status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+# диапазон первичных ключей (integer): значения вне него отклоняются до обращения к БД
+MIN_ID = -2 ** 31
+MAX_ID = 2 ** 31 - 1
+
+
+def encode_cursor(**values) -> str:
+    """Кодирование значений ключа последней записи страницы в непрозрачный курсор"""
+    payload = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Декодирование курсора, полученного от клиента"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(payload, dict):
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Некорректный курсор')
+    return payload
+
+
+class PageParams:
+    """Параметры запроса страницы"""
+
+    def __init__(
+        self,
+        cursor: Annotated[str | None, Query(description='Курсор из next_cursor предыдущей страницы')] = None,
+        limit: Annotated[int, Query(ge=1, le=MAX_PAGE_LIMIT, description='Размер страницы')] = DEFAULT_PAGE_LIMIT,
+        with_total: Annotated[bool, Query(description='Добавить приблизительное общее число записей')] = False,
+    ):
+        self.limit = limit
+        self.with_total = with_total
+        self.cursor = {} if cursor is None else decode_cursor(cursor)
+        self.after_id = self.cursor.get('id', 0)
+        # bool - подкласс int, поэтому сравнивается точный тип
+        if type(self.after_id) is not int or not MIN_ID <= self.after_id <= MAX_ID:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Некорректный курсор')
+
+    def query_params(self) -> dict:
+        """Параметры запросов с bindparam after_id и limit (с запасом в одну запись)"""
+        return {'after_id': self.after_id, 'limit': self.limit + 1}
+
+    def next_cursor(self, rows: list, key=None) -> str | None:
+        """
+        Курсор следующей страницы; rows выбраны с запасом в одну запись.
+        key возвращает значения ключа сортировки последней записи (по умолчанию - её ID).
+        """
+        if len(rows) <= self.limit:
+            return None
+        last_row = rows[self.limit - 1]
+        return encode_cursor(**(key(last_row) if key else {'id': last_row.id}))
+
+
+depends_page = Annotated[PageParams, Depends()]
+
+
+async def approximate_count(session: AsyncSession, table_name: str) -> int | None:
+    """
+    Приблизительное число строк таблицы из статистики планировщика (без COUNT(*)).
+    У секционированной таблицы статистика хранится по секциям (reltuples самой таблицы не обновляется),
+    поэтому суммируются секции; ещё не анализировавшиеся секции (reltuples = -1) считаются пустыми.
+    """
+    query = text("""
+        SELECT CASE WHEN max(c.reltuples) < 0 THEN NULL ELSE sum(greatest(c.reltuples, 0)) END::bigint
+        FROM pg_class AS c
+        WHERE c.oid = CAST(:table_name AS regclass) AND c.relkind = 'r'
+           OR c.oid IN (SELECT relid FROM pg_partition_tree(CAST(:table_name AS regclass)) WHERE isleaf)
+    """)
+    # NULL, пока таблица (или все её секции) ни разу не анализировалась
+    return (await session.execute(query, {'table_name': table_name})).scalar_one()
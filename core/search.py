@@ -0,0 +1,51 @@
+"""
+Полнотекстовый поиск по заголовкам резюме и вакансий на триграммах (pg_trgm).
+Фильтр `title %> :q` (похожесть слова запроса на слово заголовка) и сортировка по расстоянию
+`title <->> :q` обслуживаются GiST-индексом gist_trgm_ops: индекс и отбирает кандидатов,
+и отдаёт их сразу в порядке релевантности, поэтому первые страницы не требуют сортировки всех совпадений.
+Частые слова дают одинаковое расстояние сотням тысяч заголовков, и досортировка по ID потребовала бы
+прочитать их все. Поэтому индекс отдаёт не больше SEARCH_MAX_RESULTS самых релевантных записей, и только они
+упорядочиваются по паре (расстояние, ID), по которой идёт курсорная пагинация.
+"""
+from fastapi import HTTPException, status
+from sqlalchemy import Float, and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from core.pagination import PageParams
+
+SEARCH_QUERY_MIN_LENGTH = 3
+# сколько самых релевантных записей можно пролистать; время каждой страницы растёт с этим числом
+SEARCH_MAX_RESULTS = 200
+
+
+async def search_by_title(session: AsyncSession, entity, q: str, page: PageParams) -> dict:
+    """Страница записей entity, заголовок которых похож на q, от самых релевантных"""
+    distance = entity.title.op('<->>', return_type=Float)(q)
+    # сортировка только по расстоянию: индексный KNN-поиск останавливается после SEARCH_MAX_RESULTS строк
+    candidates = (
+        select(entity, distance.label('distance'))
+        .filter(entity.title.op('%>')(q))
+        .order_by(distance)
+        .limit(SEARCH_MAX_RESULTS)
+        .subquery()
+    )
+    found = aliased(entity, candidates)
+    query = (
+        select(found, candidates.c.distance)
+        .order_by(candidates.c.distance, found.id)
+        .limit(page.limit + 1)
+    )
+    if page.cursor:
+        after_distance = page.cursor.get('distance')
+        if not isinstance(after_distance, (int, float)):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Некорректный курсор')
+        query = query.filter(or_(
+            candidates.c.distance > after_distance,
+            and_(candidates.c.distance == after_distance, found.id > page.after_id),
+        ))
+    rows = (await session.execute(query)).all()
+    return {
+        'items': [row[0] for row in rows[:page.limit]],
+        'next_cursor': page.next_cursor(rows, key=lambda row: {'distance': row.distance, 'id': row[0].id}),
+    }
@@ -0,0 +1,40 @@
+"""
+Быстрая сериализация ответов.
+ORM-объекты (или Row) проверяются DTO-моделью один раз через закэшированный TypeAdapter и сразу
+превращаются в JSON-байты сериализатором pydantic-core. Обработчик возвращает готовый ответ,
+поэтому FastAPI не проверяет модель повторно и не прогоняет её через jsonable_encoder.
+Результат побайтно совпадает с ответом FastAPI по умолчанию для тех же DTO.
+"""
+from functools import lru_cache
+from time import perf_counter
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+from core.metrics import observe_serialization
+
+
+class JSONBytesResponse(Response):
+    """Ответ с заранее сериализованным JSON"""
+
+    media_type = 'application/json'
+
+
+@lru_cache
+def get_adapter(schema: Any) -> TypeAdapter:
+    """TypeAdapter строится один раз на тип ответа"""
+    return TypeAdapter(schema)
+
+
+def serialize(schema: Any, data: Any) -> bytes:
+    """Проверка данных (в т.ч. ORM-объектов) схемой и сериализация в JSON"""
+    started = perf_counter()
+    adapter = get_adapter(schema)
+    payload = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    observe_serialization(schema, started)
+    return payload
+
+
+def serialized_response(schema: Any, data: Any, **kwargs) -> JSONBytesResponse:
+    return JSONBytesResponse(content=serialize(schema, data), **kwargs)
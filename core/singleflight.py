@@ -0,0 +1,93 @@
+"""
+Объединение одинаковых одновременных GET-запросов (single-flight).
+Пока первый запрос (ведущий) выполняется, такие же запросы не обращаются к БД, а ждут его
+ответ и получают копию. Одинаковыми считаются запросы с совпадающими путём, строкой запроса и
+заголовками, от которых зависит ответ: авторизация и cookie (область доступа и чтение своих записей),
+Origin (CORS) и условные заголовки. Ответ ведущего не сохраняется после завершения запроса.
+Если ведущий завершился ошибкой, один из ожидающих становится новым ведущим, остальные ждут уже его.
+"""
+import asyncio
+
+from starlette.routing import Match
+
+from core.metrics import REQUESTS_COALESCED
+
+KEY_HEADERS = (b'authorization', b'cookie', b'origin', b'if-none-match', b'if-modified-since')
+
+
+class SingleFlight:
+    """Выполняющиеся ведущие запросы и статистика объединения"""
+
+    def __init__(self):
+        self.flights: dict[tuple, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def stats(self) -> dict:
+        return {
+            'in_flight': len(self.flights),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+        }
+
+
+class SingleFlightMiddleware:
+    """ASGI middleware: объединение одинаковых GET-запросов к маршрутам routes (кроме exclude)"""
+
+    def __init__(self, app, flights: SingleFlight, routes: list, exclude: frozenset[str] = frozenset()):
+        self.app = app
+        self.flights = flights
+        self.routes = routes
+        self.exclude = exclude
+
+    def _route_path(self, scope) -> str | None:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return None if route.path in self.exclude else route.path
+        return None
+
+    @staticmethod
+    def _key(scope) -> tuple:
+        headers = tuple(sorted((name, value) for name, value in scope['headers'] if name in KEY_HEADERS))
+        return scope['path'], scope['query_string'], headers
+
+    async def __call__(self, scope, receive, send):
+        route = (
+            self._route_path(scope) if scope['type'] == 'http' and scope['method'] == 'GET' else None
+        )
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = self._key(scope)
+        while (flight := self.flights.flights.get(key)) is not None:
+            # shield: отмена ожидающего не должна отменять общий результат
+            messages = await asyncio.shield(flight)
+            if messages is not None:
+                self.flights.coalesced += 1
+                REQUESTS_COALESCED.labels(route=route).inc()
+                for message in messages:
+                    await send(message)
+                return
+            # ведущий завершился ошибкой: первый проснувшийся ожидающий займёт его место
+
+        flight = asyncio.get_running_loop().create_future()
+        self.flights.flights[key] = flight
+        self.flights.leaders += 1
+        messages = []
+        completed = False
+
+        async def send_and_record(message):
+            messages.append(message)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+            completed = True
+        finally:
+            del self.flights.flights[key]
+            flight.set_result(messages if completed else None)
+
+
+single_flight = SingleFlight()
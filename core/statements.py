@@ -0,0 +1,75 @@
+"""
+Заранее построенные запросы горячих маршрутов.
+Конструкции select() с опциями загрузки собираются один раз при импорте, а значения, которые меняются
+от запроса к запросу, передаются через bindparam. Ключ кэша у готовой конструкции SQLAlchemy запоминает,
+поэтому на запрос не тратится время ни на построение выражения, ни на вычисление ключа кэша.
+Текст SQL всегда одинаков, и asyncpg берёт подготовленный оператор из кэша соединения.
+Варианты страниц с выборочными колонками и связями строятся при первом запросе и тоже кэшируются.
+"""
+from functools import lru_cache
+
+from sqlalchemy import Select, bindparam, func, select
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from models.declarative_models import ResumesOrm, VacanciesOrm, WorkersOrm
+
+
+# связи, которые загружаются по ?include=
+WORKERS_RELATIONS = {
+    'resumes': selectinload(WorkersOrm.resumes),
+    'resumes_parttime': selectinload(WorkersOrm.resumes_parttime),
+    'resumes_fulltime': selectinload(WorkersOrm.resumes_fulltime),
+}
+RESUMES_RELATIONS = {
+    'worker': joinedload(ResumesOrm.worker),
+    'vacancies': selectinload(ResumesOrm.vacancies_replied).load_only(VacanciesOrm.title),
+}
+
+
+@lru_cache
+def workers_page(columns: tuple[str, ...] = (), include: tuple[str, ...] = ()) -> Select:
+    """
+    Страница работников; columns - загружаемые колонки (по умолчанию все), include - связи из WORKERS_RELATIONS.
+    Параметры: after_id, limit
+    """
+    query = select(WorkersOrm).options(*(WORKERS_RELATIONS[name] for name in include))
+    if columns:
+        query = query.options(load_only(*(getattr(WorkersOrm, column) for column in columns)))
+    return (
+        query
+        .filter(WorkersOrm.id > bindparam('after_id'))
+        .order_by(WorkersOrm.id)
+        .limit(bindparam('limit'))
+    )
+
+
+@lru_cache
+def resumes_page(columns: tuple[str, ...] = (), include: tuple[str, ...] = ()) -> Select:
+    """
+    Страница резюме; columns - загружаемые колонки (по умолчанию все), include - связи из RESUMES_RELATIONS.
+    Параметры: after_id, limit
+    """
+    query = select(ResumesOrm).options(*(RESUMES_RELATIONS[name] for name in include))
+    if columns:
+        query = query.options(load_only(*(getattr(ResumesOrm, column) for column in columns)))
+    return (
+        query
+        .filter(ResumesOrm.id > bindparam('after_id'))
+        .order_by(ResumesOrm.id)
+        .limit(bindparam('limit'))
+    )
+
+
+# версия страницы резюме для ETag без загрузки связей; параметры: after_id, limit
+_resumes_page_rows = (
+    select(ResumesOrm.id, ResumesOrm.updated_at)
+    .filter(ResumesOrm.id > bindparam('after_id'))
+    .order_by(ResumesOrm.id)
+    .limit(bindparam('limit'))
+    .subquery()
+)
+RESUMES_PAGE_VERSION = select(
+    func.count(),
+    func.max(_resumes_page_rows.c.id),
+    func.max(_resumes_page_rows.c.updated_at),
+)
@@ -0,0 +1,87 @@
+"""
+Прогрев приложения при запуске.
+Всё, что иначе оплатили бы первые запросы, выполняется до начала приёма трафика: настройка мапперов
+SQLAlchemy, построение валидаторов и сериализаторов pydantic для моделей ответов, открытие соединений
+пулов и, по желанию, по одному запросу к GET-маршрутам (прогреваются кэши скомпилированных запросов
+SQLAlchemy и подготовленных выражений asyncpg). Время каждого шага пишется в лог.
+"""
+import logging
+from contextlib import AsyncExitStack, contextmanager
+from time import perf_counter
+
+import httpx
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import configure_mappers
+
+from config import app_settings, database_settings
+from core.serialization import get_adapter
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+logger.addHandler(logging.StreamHandler())
+
+WARMUP_PATHS = [
+    '/workers?limit=1',
+    '/resumes?limit=1',
+    '/resumes/search?q=python&limit=1',
+    '/vacancies/search?q=python&limit=1',
+]
+
+
+@contextmanager
+def timed_step(name: str, timings: dict[str, float]):
+    started = perf_counter()
+    yield
+    timings[name] = round((perf_counter() - started) * 1000, 1)
+
+
+def build_serializers(app: FastAPI) -> int:
+    """TypeAdapter для моделей ответов всех маршрутов, возвращает их число"""
+    schemas = {route.response_model for route in app.routes if isinstance(route, APIRoute) and route.response_model}
+    for schema in schemas:
+        get_adapter(schema)
+    return len(schemas)
+
+
+async def prefill_pool(engine: AsyncEngine, size: int):
+    """Одновременное открытие size соединений, чтобы они остались в пуле"""
+    async with AsyncExitStack() as stack:
+        for _ in range(size):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(text('SELECT 1'))
+
+
+async def warm_up_routes(app: FastAPI, paths: list[str]):
+    """По одному запросу к маршрутам без HTTP-сервера"""
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url='http://warmup') as client:
+        for path in paths:
+            response = await client.get(path)
+            if response.status_code != 200:
+                logger.warning(f'Прогрев {path}: статус {response.status_code}')
+
+
+async def warm_up(app: FastAPI, engines: list[AsyncEngine]):
+    started = perf_counter()
+    timings: dict[str, float] = {}
+    with timed_step('mappers', timings):
+        configure_mappers()
+    with timed_step('serializers', timings):
+        build_serializers(app)
+    if app_settings.PREFILL_POOL:
+        with timed_step('pool', timings):
+            for engine in engines:
+                await prefill_pool(engine, database_settings.POOL_SIZE)
+    if app_settings.WARMUP_QUERIES:
+        with timed_step('routes', timings):
+            await warm_up_routes(app, WARMUP_PATHS)
+    steps = ', '.join(f'{name} {elapsed} мс' for name, elapsed in timings.items())
+    logger.info(f'Приложение готово за {(perf_counter() - started) * 1000:.1f} мс ({steps})')
+
+
+async def dispose_engines(engines: list[AsyncEngine]):
+    for engine in engines:
+        await engine.dispose()
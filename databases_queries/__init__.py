@@ -1,21 +1,100 @@
+import asyncio
+import logging
+import math
+import os
+from contextlib import asynccontextmanager
 from typing import Annotated
 
-from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Depends, Request, Response
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from config import database_settings
+from databases_queries.pool import InstrumentedQueuePool
+from databases_queries.routing import ReplicaRouter
 
+logger = logging.getLogger(__name__)
 
-engine = create_async_engine(
-    url=database_settings.database_url,
-    echo=True
-)
+# cookie, пока жива которая, чтение клиента идёт с основного сервера
+READ_PRIMARY_COOKIE = 'db_read_primary'
+
+
+def build_engine(url: str) -> AsyncEngine:
+    """Создание движка с параметрами пула из настроек DB_*"""
+    return create_async_engine(
+        url=url,
+        echo=database_settings.ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=database_settings.POOL_SIZE,
+        max_overflow=database_settings.MAX_OVERFLOW,
+        pool_timeout=database_settings.POOL_TIMEOUT,
+        pool_recycle=database_settings.POOL_RECYCLE,
+        pool_pre_ping=database_settings.POOL_PRE_PING,
+        connect_args={
+            'statement_cache_size': database_settings.STATEMENT_CACHE_SIZE,
+            'prepared_statement_cache_size': database_settings.PREPARED_STATEMENT_CACHE_SIZE,
+        },
+    )
+
+
+engine = build_engine(database_settings.database_url)
+replica_engines = [build_engine(url) for url in database_settings.replica_urls]
+replica_router = ReplicaRouter(replica_engines, retry_after=database_settings.REPLICA_RETRY_AFTER)
 
 session_factory = async_sessionmaker(engine, expire_on_commit=True)
 
-async def get_session():
+
+def _reset_pools_after_fork():
+    """
+    Новые пулы в дочернем процессе после fork. Соединения родителя не закрываются (close=False):
+    ими продолжает пользоваться родитель, а дочерний процесс откроет свои.
+    """
+    for forked_engine in (engine, *replica_engines):
+        forked_engine.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+async def _connect_replica_session() -> AsyncSession | None:
+    """Сессия на первой доступной реплике; недоступные реплики исключаются из ротации"""
+    for replica_engine in replica_router.candidates():
+        session = session_factory(bind=replica_engine)
+        try:
+            await session.connection()
+        except (OSError, asyncio.TimeoutError, SQLAlchemyError) as exc:
+            logger.warning(f'Реплика {replica_engine.url.render_as_string()} недоступна: {exc!r}')
+            await session.close()
+            replica_router.mark_down(replica_engine)
+            continue
+        return session
+    return None
+
+
+@asynccontextmanager
+async def read_session(prefer_primary: bool = False):
+    """Сессия только для чтения: реплика по кругу, при их недоступности - основной сервер"""
+    session = None if prefer_primary else await _connect_replica_session()
+    if session is None:
+        session = session_factory()
+    async with session:
+        yield session
+
+
+async def get_session(request: Request, response: Response):
     """Сессия для взаимодействия с БД"""
+    if replica_engines and database_settings.READ_YOUR_WRITES_SECONDS > 0 and request.method not in ('GET', 'HEAD'):
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, '1', max_age=math.ceil(database_settings.READ_YOUR_WRITES_SECONDS), httponly=True
+        )
     async with session_factory() as session:
         yield session
 
 
+async def get_read_session(request: Request):
+    """Сессия для чтения с реплик"""
+    async with read_session(prefer_primary=READ_PRIMARY_COOKIE in request.cookies) as session:
+        yield session
+
+
 depends_session = Annotated[AsyncSession, Depends(get_session)]
+depends_read_session = Annotated[AsyncSession, Depends(get_read_session)]
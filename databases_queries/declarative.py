@@ -2,16 +2,13 @@
 Примеры ORM SQL-запросов
 """
 from sqlalchemy import select, func, Integer, and_, insert
-from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import aliased, selectinload, contains_eager, joinedload
-from databases_queries import engine
+from core.bulk import insert_replies
+from databases_queries import engine, session_factory
+from databases_queries.imperative import CoreSQLRequests, DEFAULT_USERNAMES
 from models.declarative_models import WorkersOrm, Base, ResumesOrm, VacanciesOrm
 from models.enums import WorkLoad
-from models.schemas import WorkersRelDTO, M2MResumesVacanciesDTO
-
-
-# сессия для взаимодействия с БД
-session_factory = async_sessionmaker(engine)
+from models.schemas import WorkersRelDTO, M2MResumesVacanciesDTO, VacanciesRepliesAddDTO
 
 
 class DeclarativeSQLQuery:
@@ -229,12 +226,12 @@ class DeclarativeSQLQuery:
     async def add_vacancies_and_replies():
         async with session_factory() as session:
             new_vacancy = VacanciesOrm(title="Python разработчик", compensation=100000)
-            get_resume_1 = select(ResumesOrm).options(selectinload(ResumesOrm.vacancies_replied)).filter_by(id=1)
-            get_resume_2 = select(ResumesOrm).options(selectinload(ResumesOrm.vacancies_replied)).filter_by(id=2)
-            resume_1 = (await session.execute(get_resume_1)).scalar_one()
-            resume_2 = (await session.execute(get_resume_2)).scalar_one()
-            resume_1.vacancies_replied.append(new_vacancy)
-            resume_2.vacancies_replied.append(new_vacancy)
+            session.add(new_vacancy)
+            await session.flush()
+            # отклики всех резюме добавляются одним запросом, без загрузки коллекций vacancies_replied
+            await insert_replies(session, [
+                VacanciesRepliesAddDTO(resume_id=resume_id, vacancy_id=new_vacancy.id) for resume_id in (1, 2)
+            ])
             await session.commit()
 
     @staticmethod
@@ -251,3 +248,27 @@ class DeclarativeSQLQuery:
             result_dto = [M2MResumesVacanciesDTO.model_validate(row, from_attributes=True) for row in result_orm]
             print(f"{result_dto=}")
             return result_dto
+
+
+class OrmSQL(CoreSQLRequests):
+    """Те же операции, что у RawSQL и QueryBuilderSQL, через ORM"""
+
+    @staticmethod
+    async def insert_data(usernames: list[str] = DEFAULT_USERNAMES):
+        async with session_factory() as session:
+            session.add_all([WorkersOrm(username=username) for username in usernames])
+            await session.commit()
+
+    @staticmethod
+    async def select_data():
+        async with session_factory() as session:
+            result = await session.execute(select(WorkersOrm))
+            workers = result.scalars().all()
+        return workers
+
+    @staticmethod
+    async def update_data(worker_id: int = 1, new_username: str = 'Ivan'):
+        async with session_factory() as session:
+            worker_obj = await session.get(entity=WorkersOrm, ident=worker_id)
+            worker_obj.username = new_username
+            await session.commit()
@@ -9,6 +9,8 @@ from sqlalchemy import text, insert, select, update
 from databases_queries import engine
 from models.imperative_models import table_metadata, workers_table
 
+DEFAULT_USERNAMES = ['Bobr', 'Volk']
+
 
 class CoreSQLRequests(ABC):
     """Примеры CORE SQL-запросов"""
@@ -16,12 +18,13 @@ class CoreSQLRequests(ABC):
     @staticmethod
     async def recreate_tables():
         """Пересоздание таблиц"""
-        table_metadata.drop_all(bind=engine)
-        table_metadata.create_all(bind=engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(table_metadata.drop_all)
+            await conn.run_sync(table_metadata.create_all)
 
     @staticmethod
     @abstractmethod
-    async def insert_data():
+    async def insert_data(usernames: list[str] = DEFAULT_USERNAMES):
         """Вставка данных"""
 
     @staticmethod
@@ -31,7 +34,7 @@ class CoreSQLRequests(ABC):
 
     @staticmethod
     @abstractmethod
-    async def update_data():
+    async def update_data(worker_id: int = 1, new_username: str = 'Ivan'):
         """Обновление данных"""
 
 
@@ -39,67 +42,63 @@ class RawSQL(CoreSQLRequests):
     """Примеры сырых SQL-запросов"""
 
     @staticmethod
-    async def insert_data():
-        with engine.connect() as conn:
-            sql_request = (
-                """insert into workers (username) values ('Bobr') , ('Volk');"""
+    async def insert_data(usernames: list[str] = DEFAULT_USERNAMES):
+        async with engine.connect() as conn:
+            sql_request = text(
+                """insert into workers (username) values (:username);"""
             )
-            conn.execute(text(sql_request))
-            conn.commit()
+            await conn.execute(sql_request, [{'username': username} for username in usernames])
+            await conn.commit()
 
     @staticmethod
     async def select_data():
-        with engine.connect() as conn:
+        async with engine.connect() as conn:
             sql_request = """select * from workers;"""
-            result = conn.execute(text(sql_request))
+            result = await conn.execute(text(sql_request))
             workers = result.all()
         return workers
 
     @staticmethod
-    async def update_data():
-        worker_id = 1
-        new_username = 'Ivan'
-        with engine.connect() as conn:
+    async def update_data(worker_id: int = 1, new_username: str = 'Ivan'):
+        async with engine.connect() as conn:
             sql_request = text(
                 """update workers set username=:username where id=:id;"""
             ).bindparams(username=new_username, id=worker_id)  # bindparams - защита от SQL-инъекций
-            conn.execute(sql_request)
-            conn.commit()
+            await conn.execute(sql_request)
+            await conn.commit()
 
 
 class QueryBuilderSQL(CoreSQLRequests):
     """Примеры SQL-запросов на основе query builder"""
 
     @staticmethod
-    async def insert_data():
+    async def insert_data(usernames: list[str] = DEFAULT_USERNAMES):
         """Пример query_builder SQL-запроса"""
-        with engine.connect() as conn:
+        async with engine.connect() as conn:
             sql_request = insert(workers_table).values(
-                [{'username': 'Bobr'}, {'username': 'Volk'}]
+                [{'username': username} for username in usernames]
             )
-            conn.execute(sql_request)
-            conn.commit()
+            await conn.execute(sql_request)
+            await conn.commit()
 
     @staticmethod
     async def select_data():
-        with engine.connect() as conn:
+        async with engine.connect() as conn:
             query = select(workers_table)
-            query_result = conn.execute(query)
+            query_result = await conn.execute(query)
             workers = query_result.all()
         return workers
 
     @staticmethod
-    async def update_data():
-        worker_id = 1
-        new_username = 'Ivan'
-        with engine.connect() as conn:
+    async def update_data(worker_id: int = 1, new_username: str = 'Ivan'):
+        async with engine.connect() as conn:
             query = (
                 update(workers_table)
                 .values(username=new_username)
                 .filter_by(id=worker_id)
             )
-            conn.execute(query)
-            conn.commit()
+            await conn.execute(query)
+            await conn.commit()
 
 
 async def apply_queries():
@@ -108,4 +107,4 @@ async def apply_queries():
         await class_obj.recreate_tables()
         await class_obj.insert_data()
         await class_obj.update_data()
-        print(class_obj.select_data())
+        print(await class_obj.select_data())
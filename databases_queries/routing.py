@@ -0,0 +1,32 @@
+"""
+Маршрутизация чтения по репликам
+"""
+from time import monotonic
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class ReplicaRouter:
+    """Круговой выбор реплики с временным исключением недоступных"""
+
+    def __init__(self, engines: list[AsyncEngine], retry_after: float):
+        self.engines = engines
+        self.retry_after = retry_after
+        self._position = 0
+        self._down_until = [0.0] * len(engines)
+
+    def candidates(self) -> list[AsyncEngine]:
+        """Доступные реплики в порядке обхода, начиная со следующей по кругу"""
+        if not self.engines:
+            return []
+        start = self._position
+        self._position = (self._position + 1) % len(self.engines)
+        now = monotonic()
+        order = [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+        return [self.engines[index] for index in order if self._down_until[index] <= now]
+
+    def mark_down(self, engine: AsyncEngine):
+        self._down_until[self.engines.index(engine)] = monotonic() + self.retry_after
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        return self._down_until[self.engines.index(engine)] <= monotonic()
@@ -1,23 +1,60 @@
+import argparse
 import asyncio
+from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from config import app_settings
+from core.analytics import analytics_router, rebuild_salary_histogram
+from core.cache import resumes_cache_listener
 from core.core import core_router
+from core.instrumentation import SQLInstrumentationMiddleware, instrument_engine
+from core.internal import internal_router
+from core.metrics import PrometheusMiddleware, mark_process_dead, metrics_router
+from core.singleflight import SingleFlightMiddleware, single_flight
+from core.warmup import dispose_engines, warm_up
+from databases_queries import engine, replica_engines, session_factory
 from databases_queries.declarative import DeclarativeSQLQuery
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    engines = [engine, *replica_engines]
+    await warm_up(app, engines)
+    resumes_cache_listener.start()
+    yield
+    await resumes_cache_listener.stop()
+    await dispose_engines(engines)
+    mark_process_dead()
+
+
+for instrumented_engine in (engine, *replica_engines):
+    instrument_engine(instrumented_engine)
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"]
 )
+app.add_middleware(SQLInstrumentationMiddleware)
+# потоковая выгрузка не объединяется: ответ ведущего пришлось бы держать в памяти целиком
+app.add_middleware(
+    SingleFlightMiddleware, flights=single_flight, routes=core_router.routes, exclude=frozenset({'/resumes/export'})
+)
+app.add_middleware(PrometheusMiddleware, routes=app.router.routes)
 app.include_router(core_router)
+app.include_router(analytics_router)
+app.include_router(internal_router)
+app.include_router(metrics_router)
 
 
-async def main():
+async def demo():
+    """Пересоздание таблиц и демонстрационные запросы"""
     await DeclarativeSQLQuery.recreate_tables()
+    async with session_factory() as session:
+        await rebuild_salary_histogram(session)
     await DeclarativeSQLQuery.insert_data()
     await DeclarativeSQLQuery.update_data()
     await DeclarativeSQLQuery.select_data()
@@ -27,5 +64,14 @@ async def main():
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
-    uvicorn.run('main:app', reload=True)
+    parser = argparse.ArgumentParser(description='Запуск приложения')
+    parser.add_argument(
+        '--demo', action='store_true',
+        help='Пересоздать таблицы, выполнить демонстрационные запросы и запустить сервер с перезагрузкой'
+    )
+    args = parser.parse_args()
+    if args.demo:
+        asyncio.run(demo())
+        uvicorn.run('main:app', reload=True)
+    else:
+        uvicorn.run(app, host=app_settings.HOST, port=app_settings.PORT)
@@ -0,0 +1,38 @@
+"""trigram title search
+
+Revision ID: 3f1c9a7b2d10
+Revises: 9a4c6e2b8d17
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7b2d10'
+down_revision: Union[str, None] = '9a4c6e2b8d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # индексы строятся без блокировки записи, CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_resumes_title_trgm', 'resumes', ['title'], postgresql_using='gist',
+            postgresql_ops={'title': 'gist_trgm_ops'}, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_vacancies_title_trgm', 'vacancies', ['title'], postgresql_using='gist',
+            postgresql_ops={'title': 'gist_trgm_ops'}, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_vacancies_title_trgm', table_name='vacancies', postgresql_concurrently=True)
+        op.drop_index('ix_resumes_title_trgm', table_name='resumes', postgresql_concurrently=True)
@@ -0,0 +1,73 @@
+"""baseline schema
+
+Revision ID: 5d8f2a1c7e04
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+Схема до первой миграции: workers, resumes, vacancies и vacancies_replies без индексов, счётчиков и триггеров.
+Порядок развёртывания описан в migrations/README.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8f2a1c7e04'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UTC_NOW = sa.text("TIMEZONE('utc', now())")
+
+
+def upgrade() -> None:
+    op.create_table(
+        'workers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(), nullable=False, comment='Имя пользователя'),
+        sa.PrimaryKeyConstraint('id'),
+        comment='Работники',
+    )
+    op.create_table(
+        'resumes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=256), nullable=False, comment='Заголовок резюме'),
+        sa.Column('salary', sa.Integer(), nullable=True, comment='Заработная плата'),
+        sa.Column(
+            'workload', sa.Enum('PARTTIME', 'FULLTIME', name='workload'), nullable=False, comment='Рабочая нагрузка'
+        ),
+        sa.Column(
+            'worker_id', sa.Integer(), nullable=False, comment='Ссылка на ID работника, который создал резюме'
+        ),
+        sa.Column('created_at', sa.DateTime(), server_default=UTC_NOW, nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=UTC_NOW, nullable=False),
+        sa.ForeignKeyConstraint(['worker_id'], ['workers.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        comment='Резюме',
+    )
+    op.create_table(
+        'vacancies',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=256), nullable=False),
+        sa.Column('compensation', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'vacancies_replies',
+        sa.Column('resume_id', sa.Integer(), nullable=False),
+        sa.Column('vacancy_id', sa.Integer(), nullable=False),
+        sa.Column('cover_letter', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['vacancy_id'], ['vacancies.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('resume_id', 'vacancy_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('vacancies_replies')
+    op.drop_table('vacancies')
+    op.drop_table('resumes')
+    op.drop_table('workers')
+    sa.Enum(name='workload').drop(op.get_bind())
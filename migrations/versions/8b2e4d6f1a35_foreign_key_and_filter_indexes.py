@@ -0,0 +1,37 @@
+"""foreign key and filter indexes
+
+Revision ID: 8b2e4d6f1a35
+Revises: 3f1c9a7b2d10
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a35'
+down_revision: Union[str, None] = '3f1c9a7b2d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # индексы строятся без блокировки записи, CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_resumes_worker_id_workload', 'resumes', ['worker_id', 'workload'], postgresql_concurrently=True
+        )
+        op.create_index('ix_resumes_workload', 'resumes', ['workload'], postgresql_concurrently=True)
+        op.create_index(
+            'ix_vacancies_replies_vacancy_id', 'vacancies_replies', ['vacancy_id'], postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_vacancies_replies_vacancy_id', table_name='vacancies_replies', postgresql_concurrently=True)
+        op.drop_index('ix_resumes_workload', table_name='resumes', postgresql_concurrently=True)
+        op.drop_index('ix_resumes_worker_id_workload', table_name='resumes', postgresql_concurrently=True)
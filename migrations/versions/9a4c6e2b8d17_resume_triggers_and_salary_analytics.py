@@ -0,0 +1,133 @@
+"""resume change notifications and salary analytics
+
+Revision ID: 9a4c6e2b8d17
+Revises: 5d8f2a1c7e04
+Create Date: 2026-10-18 09:30:00.000000
+
+Триггер resumes_changed публикует ID изменённых резюме для инвалидации кэша ответов, триггеры resumes_salary_*
+пишут журнал изменений зарплат для гистограммы. Гистограмма строится здесь же для ANALYTICS_SALARY_BUCKET_WIDTH
+из настроек: построение читает resumes целиком и блокирует запись в неё до конца миграции.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from config import analytics_settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c6e2b8d17'
+down_revision: Union[str, None] = '5d8f2a1c7e04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BUCKET_WIDTH = analytics_settings.SALARY_BUCKET_WIDTH
+# то же имя состояния, что в core.analytics: по нему приложение находит построенную гистограмму
+REFRESH_NAME = f'resume_salary:{BUCKET_WIDTH}'
+
+SALARY_EVENTS = [
+    ('insert', 'NEW TABLE AS new_rows'),
+    ('update', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('delete', 'OLD TABLE AS old_rows'),
+]
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_resumes_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('resumes_changed', OLD.id::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+    CREATE TRIGGER resumes_changed
+    AFTER UPDATE OR DELETE ON resumes
+    FOR EACH ROW EXECUTE FUNCTION notify_resumes_changed()
+    """)
+
+    workload = postgresql.ENUM('PARTTIME', 'FULLTIME', name='workload', create_type=False)
+    op.create_table(
+        'resume_salary_histogram',
+        sa.Column('workload', workload, nullable=False, comment='Рабочая нагрузка'),
+        sa.Column(
+            'keyword', sa.String(length=256), nullable=False,
+            comment='Слово из заголовка резюме в нижнем регистре, пустая строка - все резюме'
+        ),
+        sa.Column('bucket', sa.Integer(), nullable=False, comment='Нижняя граница корзины зарплаты'),
+        sa.Column('resumes_count', sa.BigInteger(), nullable=False, comment='Число резюме в корзине'),
+        sa.Column('salary_sum', sa.BigInteger(), nullable=False, comment='Сумма зарплат в корзине'),
+        sa.PrimaryKeyConstraint('workload', 'keyword', 'bucket'),
+        comment='Гистограмма зарплат резюме по типу занятости и слову заголовка',
+    )
+    op.create_table(
+        'resume_salary_changes',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('workload', workload, nullable=False),
+        sa.Column('title', sa.String(length=256), nullable=False),
+        sa.Column('salary', sa.Integer(), nullable=False),
+        sa.Column('sign', sa.SmallInteger(), nullable=False, comment='+1 - резюме добавлено, -1 - удалено'),
+        sa.PrimaryKeyConstraint('id'),
+        comment='Необработанные изменения зарплат резюме',
+    )
+    op.create_table(
+        'analytics_refreshes',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+        comment='Время последнего обновления материализованной аналитики',
+    )
+    op.execute("""
+    CREATE OR REPLACE FUNCTION track_resume_salary_changes() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO resume_salary_changes (workload, title, salary, sign)
+            SELECT workload, title, salary, -1 FROM old_rows WHERE salary IS NOT NULL;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO resume_salary_changes (workload, title, salary, sign)
+            SELECT workload, title, salary, 1 FROM new_rows WHERE salary IS NOT NULL;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    for event_name, referencing in SALARY_EVENTS:
+        op.execute(f"""
+        CREATE TRIGGER resumes_salary_{event_name}
+        AFTER {event_name.upper()} ON resumes REFERENCING {referencing}
+        FOR EACH STATEMENT EXECUTE FUNCTION track_resume_salary_changes()
+        """)
+
+    # полное построение гистограммы (копия core.analytics.REBUILD_HISTOGRAM на момент миграции)
+    op.execute(sa.text('SELECT pg_advisory_xact_lock(hashtext(:name))').bindparams(name=REFRESH_NAME))
+    op.execute('LOCK TABLE resumes IN SHARE MODE')
+    op.execute(sa.text(r"""
+    INSERT INTO resume_salary_histogram (workload, keyword, bucket, resumes_count, salary_sum)
+    SELECT workload, keyword, salary / :bucket_width * :bucket_width, count(*), sum(salary)
+    FROM resumes AS source
+    CROSS JOIN LATERAL (
+        SELECT '' AS keyword
+        UNION
+        SELECT word FROM regexp_split_to_table(lower(source.title), '\W+') AS word WHERE word <> ''
+    ) AS keywords
+    WHERE salary IS NOT NULL
+    GROUP BY 1, 2, 3
+    """).bindparams(bucket_width=BUCKET_WIDTH))
+    op.execute(sa.text("""
+    INSERT INTO analytics_refreshes (name, refreshed_at) VALUES (:name, TIMEZONE('utc', now()))
+    """).bindparams(name=REFRESH_NAME))
+
+
+def downgrade() -> None:
+    for event_name, _ in SALARY_EVENTS:
+        op.execute(f'DROP TRIGGER resumes_salary_{event_name} ON resumes')
+    op.execute('DROP FUNCTION track_resume_salary_changes()')
+    op.drop_table('analytics_refreshes')
+    op.drop_table('resume_salary_changes')
+    op.drop_table('resume_salary_histogram')
+    op.execute('DROP TRIGGER resumes_changed ON resumes')
+    op.execute('DROP FUNCTION notify_resumes_changed()')
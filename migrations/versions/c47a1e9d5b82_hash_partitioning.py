@@ -0,0 +1,175 @@
+"""hash partitioning of resumes and vacancies_replies
+
+Revision ID: c47a1e9d5b82
+Revises: 8b2e4d6f1a35
+Create Date: 2026-10-18 15:00:00.000000
+
+Миграция выполняется, только если задан DB_PARTITIONS > 0 (то же значение, что и у приложения).
+Таблицы пересоздаются секционированными и данные копируются, на это время запись в них блокируется -
+применять в окно обслуживания. Чтобы включить секционирование позже, откатите миграцию и примените её снова
+с нужным DB_PARTITIONS.
+Триггеры resumes пересоздаются на новой таблице, их функции создаёт миграция 9a4c6e2b8d17.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from config import database_settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a1e9d5b82'
+down_revision: Union[str, None] = '8b2e4d6f1a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = database_settings.PARTITIONS
+
+RESUMES_TRIGGERS = [
+    """
+    CREATE TRIGGER resumes_changed
+    AFTER UPDATE OR DELETE ON resumes
+    FOR EACH ROW EXECUTE FUNCTION notify_resumes_changed()
+    """,
+    """
+    CREATE TRIGGER resumes_salary_insert
+    AFTER INSERT ON resumes REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_resume_salary_changes()
+    """,
+    """
+    CREATE TRIGGER resumes_salary_update
+    AFTER UPDATE ON resumes REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_resume_salary_changes()
+    """,
+    """
+    CREATE TRIGGER resumes_salary_delete
+    AFTER DELETE ON resumes REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_resume_salary_changes()
+    """,
+]
+
+REPLIES_RESUME_EVENTS = ('insert', 'update')
+
+
+def rebuild_table(table: str, partition_by: str | None):
+    """Пересоздание таблицы (секционированной по partition_by или обычной) с копированием данных"""
+    op.execute(f'CREATE TABLE {table}_rebuilt (LIKE {table} INCLUDING DEFAULTS INCLUDING COMMENTS)'
+               + (f' PARTITION BY HASH ({partition_by})' if partition_by else ''))
+    if partition_by:
+        for remainder in range(PARTITIONS):
+            op.execute(f'CREATE TABLE {table}_p{remainder} PARTITION OF {table}_rebuilt '
+                       f'FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})')
+    op.execute(f'INSERT INTO {table}_rebuilt SELECT * FROM {table}')
+
+
+def swap_resumes():
+    # последовательность id принадлежит старой таблице и удалилась бы вместе с ней
+    op.execute('ALTER SEQUENCE resumes_id_seq OWNED BY NONE')
+    op.execute('DROP TABLE resumes')
+    op.execute('ALTER TABLE resumes_rebuilt RENAME TO resumes')
+    op.execute('ALTER SEQUENCE resumes_id_seq OWNED BY resumes.id')
+
+
+def create_resumes_indexes():
+    op.create_foreign_key(
+        'resumes_worker_id_fkey', 'resumes', 'workers', ['worker_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index(
+        'ix_resumes_title_trgm', 'resumes', ['title'],
+        postgresql_using='gist', postgresql_ops={'title': 'gist_trgm_ops'}
+    )
+    op.create_index('ix_resumes_worker_id_workload', 'resumes', ['worker_id', 'workload'])
+    op.create_index('ix_resumes_workload', 'resumes', ['workload'])
+    for trigger in RESUMES_TRIGGERS:
+        op.execute(trigger)
+
+
+def create_replies_indexes():
+    op.create_primary_key('vacancies_replies_pkey', 'vacancies_replies', ['resume_id', 'vacancy_id'])
+    op.create_foreign_key(
+        'vacancies_replies_vacancy_id_fkey', 'vacancies_replies', 'vacancies', ['vacancy_id'], ['id'],
+        ondelete='CASCADE'
+    )
+    op.create_index('ix_vacancies_replies_vacancy_id', 'vacancies_replies', ['vacancy_id'])
+
+
+def upgrade() -> None:
+    if not PARTITIONS:
+        return
+
+    rebuild_table('vacancies_replies', 'vacancy_id')
+    op.execute('DROP TABLE vacancies_replies')
+    op.execute('ALTER TABLE vacancies_replies_rebuilt RENAME TO vacancies_replies')
+
+    rebuild_table('resumes', 'worker_id')
+    swap_resumes()
+    # ключ секционирования входит в первичный ключ
+    op.create_primary_key('resumes_pkey', 'resumes', ['id', 'worker_id'])
+    create_resumes_indexes()
+
+    create_replies_indexes()
+    # внешний ключ на resumes(id) невозможен: каскадное удаление откликов выполняет триггер
+    op.execute("""
+    CREATE OR REPLACE FUNCTION delete_resume_replies() RETURNS trigger AS $$
+    BEGIN
+        DELETE FROM vacancies_replies WHERE resume_id IN (SELECT id FROM old_rows);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+    CREATE TRIGGER resumes_delete_replies
+    AFTER DELETE ON resumes REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION delete_resume_replies()
+    """)
+    # и проверку ссылки: отклик только на существующее резюме, ошибка с кодом внешнего ключа (23503)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION check_replies_resume_exists() RETURNS trigger AS $$
+    DECLARE
+        missing integer;
+    BEGIN
+        PERFORM 1 FROM resumes WHERE id IN (SELECT resume_id FROM new_rows) FOR KEY SHARE;
+        SELECT resume_id INTO missing FROM new_rows
+        WHERE NOT EXISTS (SELECT 1 FROM resumes WHERE resumes.id = new_rows.resume_id)
+        LIMIT 1;
+        IF FOUND THEN
+            RAISE foreign_key_violation USING
+                MESSAGE = 'insert or update on table "vacancies_replies" violates foreign key "resume_id"',
+                DETAIL = format('Key (resume_id)=(%s) is not present in table "resumes".', missing);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    for event_name in REPLIES_RESUME_EVENTS:
+        op.execute(f"""
+        CREATE TRIGGER vacancies_replies_resume_{event_name}
+        AFTER {event_name.upper()} ON vacancies_replies REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION check_replies_resume_exists()
+        """)
+
+
+def downgrade() -> None:
+    if not PARTITIONS:
+        return
+
+    op.execute('DROP TRIGGER resumes_delete_replies ON resumes')
+    op.execute('DROP FUNCTION delete_resume_replies()')
+    for event_name in REPLIES_RESUME_EVENTS:
+        op.execute(f'DROP TRIGGER vacancies_replies_resume_{event_name} ON vacancies_replies')
+    op.execute('DROP FUNCTION check_replies_resume_exists()')
+
+    rebuild_table('vacancies_replies', None)
+    op.execute('DROP TABLE vacancies_replies')
+    op.execute('ALTER TABLE vacancies_replies_rebuilt RENAME TO vacancies_replies')
+    create_replies_indexes()
+
+    rebuild_table('resumes', None)
+    swap_resumes()
+    op.create_primary_key('resumes_pkey', 'resumes', ['id'])
+    create_resumes_indexes()
+
+    op.create_foreign_key(
+        'vacancies_replies_resume_id_fkey', 'vacancies_replies', 'resumes', ['resume_id'], ['id'],
+        ondelete='CASCADE'
+    )
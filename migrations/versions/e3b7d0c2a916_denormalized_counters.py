@@ -0,0 +1,85 @@
+"""denormalized resume and reply counters
+
+Revision ID: e3b7d0c2a916
+Revises: c47a1e9d5b82
+Create Date: 2026-10-18 17:00:00.000000
+
+Колонки со значением по умолчанию добавляются без перезаписи таблиц, заполнение счётчиков читает
+resumes и vacancies_replies целиком и блокирует запись в них до конца миграции.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7d0c2a916'
+down_revision: Union[str, None] = 'c47a1e9d5b82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (таблица, колонка счётчика, таблица-источник, внешний ключ источника, комментарий)
+COUNTERS = [
+    ('workers', 'resume_count', 'resumes', 'worker_id', 'Число резюме работника, обновляется триггером'),
+    ('vacancies', 'reply_count', 'vacancies_replies', 'vacancy_id', 'Число откликов на вакансию, обновляется триггером'),
+]
+EVENTS = [
+    ('insert', 'NEW TABLE AS new_rows'),
+    ('update', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('delete', 'OLD TABLE AS old_rows'),
+]
+
+
+def upgrade() -> None:
+    for table, column, source, key, comment in COUNTERS:
+        op.add_column(table, sa.Column(column, sa.Integer(), server_default=sa.text('0'), nullable=False,
+                                       comment=comment))
+        # счётчики заполняются до создания триггеров, блокировка не даёт изменениям проскочить между ними
+        op.execute(f'LOCK TABLE {source} IN SHARE MODE')
+        op.execute(f"""
+        UPDATE {table} SET {column} = actual.n
+        FROM (SELECT {key}, count(*) AS n FROM {source} GROUP BY {key}) AS actual
+        WHERE {table}.id = actual.{key}
+        """)
+        op.execute(f"""
+        CREATE OR REPLACE FUNCTION track_{table}_{column}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE {table} SET {column} = {column} + delta.n
+                FROM (SELECT {key}, count(*) AS n FROM new_rows GROUP BY {key}) AS delta
+                WHERE {table}.id = delta.{key};
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE {table} SET {column} = {column} - delta.n
+                FROM (SELECT {key}, count(*) AS n FROM old_rows GROUP BY {key}) AS delta
+                WHERE {table}.id = delta.{key};
+            ELSE
+                UPDATE {table} SET {column} = {column} + delta.n
+                FROM (
+                    SELECT {key}, sum(n) AS n FROM (
+                        SELECT {key}, 1 AS n FROM new_rows
+                        UNION ALL
+                        SELECT {key}, -1 FROM old_rows
+                    ) AS moved
+                    GROUP BY {key} HAVING sum(n) <> 0
+                ) AS delta
+                WHERE {table}.id = delta.{key};
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """)
+        for event_name, referencing in EVENTS:
+            op.execute(f"""
+            CREATE TRIGGER {source}_{column}_{event_name}
+            AFTER {event_name.upper()} ON {source} REFERENCING {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION track_{table}_{column}()
+            """)
+
+
+def downgrade() -> None:
+    for table, column, source, key, comment in reversed(COUNTERS):
+        for event_name, _ in EVENTS:
+            op.execute(f'DROP TRIGGER {source}_{column}_{event_name} ON {source}')
+        op.execute(f'DROP FUNCTION track_{table}_{column}()')
+        op.drop_column(table, column)
@@ -7,9 +7,10 @@
 import datetime
 from typing import Annotated
 
-from sqlalchemy import ForeignKey, text, String
-from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, relationship
+from sqlalchemy import DDL, BigInteger, ForeignKey, ForeignKeyConstraint, Index, SmallInteger, event, text, String
+from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, declared_attr, relationship
 
+from config import database_settings
 from models.enums import WorkLoad
 
 intpk = Annotated[int, mapped_column(primary_key=True, comment='Уникальный идентификатор записи')]
@@ -22,10 +23,20 @@ created_at = Annotated[
 updated_at = Annotated[
     datetime.datetime, mapped_column(
         server_default=text("TIMEZONE('utc', now())"),
-        onupdate=datetime.datetime.utcnow(),
+        onupdate=text("TIMEZONE('utc', now())"),
         comment='Дата и время последнего обновления записи'
     )
 ]
+# хэш-секционирование resumes по worker_id и vacancies_replies по vacancy_id (0 - выключено)
+PARTITIONS = database_settings.PARTITIONS
+# денормализованные счётчики: (таблица, колонка счётчика, таблица-источник, внешний ключ источника)
+COUNTERS = [
+    ('workers', 'resume_count', 'resumes', 'worker_id'),
+    ('vacancies', 'reply_count', 'vacancies_replies', 'vacancy_id'),
+]
+# канал LISTEN/NOTIFY, в который триггер публикует ID изменённых и удалённых резюме
+RESUMES_CHANGED_CHANNEL = 'resumes_changed'
+
 str256 = Annotated[
     str, 256
 ]
@@ -38,6 +49,28 @@ class Base(DeclarativeBase):
     }
 
 
+# триграммные индексы для поиска по заголовкам
+event.listen(Base.metadata, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+
+
+def partition_name(table_name: str, remainder: int) -> str:
+    return f'{table_name}_p{remainder}'
+
+
+def partitioned_by(column: str) -> dict:
+    """Параметры таблицы, секционированной по хэшу column (пусто, если секционирование выключено)"""
+    return {'postgresql_partition_by': f'HASH ({column})'} if PARTITIONS else {}
+
+
+def create_partitions(table):
+    """Создание секций вместе с секционированной таблицей"""
+    for remainder in range(PARTITIONS):
+        event.listen(table, 'after_create', DDL(
+            f'CREATE TABLE {partition_name(table.name, remainder)} PARTITION OF {table.name} '
+            f'FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})'
+        ))
+
+
 class WorkersOrm(Base):
 
     __tablename__ = 'workers'
@@ -45,6 +78,9 @@ class WorkersOrm(Base):
 
     id: Mapped[intpk]
     username: Mapped[str] = mapped_column(comment='Имя пользователя')
+    resume_count: Mapped[int] = mapped_column(
+        server_default=text('0'), default=0, comment='Число резюме работника, обновляется триггером'
+    )
 
     resumes: Mapped[list["ResumesOrm"]] = relationship(
         back_populates="worker",
@@ -69,14 +105,26 @@ class WorkersOrm(Base):
 class ResumesOrm(Base):
 
     __tablename__ = 'resumes'
-    __table_args__ = {'comment': 'Резюме'}
+    __table_args__ = (
+        Index('ix_resumes_title_trgm', 'title', postgresql_using='gist', postgresql_ops={'title': 'gist_trgm_ops'}),
+        # покрывает и выборку по worker_id (selectinload), и связи resumes_parttime/resumes_fulltime
+        Index('ix_resumes_worker_id_workload', 'worker_id', 'workload'),
+        {'comment': 'Резюме', **partitioned_by('worker_id')},
+    )
 
-    id: Mapped[intpk]
+    # ключ секционирования обязан входить в первичный ключ таблицы,
+    # но для ORM резюме по-прежнему определяется одним ID
+    @declared_attr.directive
+    def __mapper_args__(cls):
+        return {'primary_key': [cls.__table__.c.id]}
+
+    id: Mapped[intpk] = mapped_column(autoincrement=True)
     title: Mapped[str256] = mapped_column(comment='Заголовок резюме')
     salary: Mapped[int | None] = mapped_column(comment='Заработная плата')
-    workload: Mapped[WorkLoad] = mapped_column(comment='Рабочая нагрузка')
+    workload: Mapped[WorkLoad] = mapped_column(index=True, comment='Рабочая нагрузка')
     worker_id: Mapped[int] = mapped_column(
         ForeignKey('workers.id', ondelete='CASCADE'),
+        primary_key=bool(PARTITIONS),
         comment='Ссылка на ID работника, который создал резюме'
     )
     created_at: Mapped[created_at]
@@ -96,10 +144,16 @@ class ResumesOrm(Base):
 
 class VacanciesOrm(Base):
     __tablename__ = "vacancies"
+    __table_args__ = (
+        Index('ix_vacancies_title_trgm', 'title', postgresql_using='gist', postgresql_ops={'title': 'gist_trgm_ops'}),
+    )
 
     id: Mapped[intpk]
     title: Mapped[str256]
     compensation: Mapped[int]
+    reply_count: Mapped[int] = mapped_column(
+        server_default=text('0'), default=0, comment='Число откликов на вакансию, обновляется триггером'
+    )
 
     resumes_replied: Mapped[list["ResumesOrm"]] = relationship(
         back_populates="vacancies_replied",
@@ -109,14 +163,206 @@ class VacanciesOrm(Base):
 
 class VacanciesRepliesOrm(Base):
     __tablename__ = "vacancies_replies"
+    __table_args__ = (
+        # на секционированную resumes внешний ключ по одному id сослаться не может (id не уникален сам по себе):
+        # в БД он не создаётся, каскадное удаление выполняет триггер resumes_delete_replies, проверку ссылки -
+        # триггеры vacancies_replies_resume_*,
+        # а в метаданных ключ остаётся, чтобы связи ORM строились как раньше
+        ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='CASCADE').ddl_if(
+            callable_=lambda *args, **kwargs: not PARTITIONS
+        ),
+        partitioned_by('vacancy_id'),
+    )
 
     resume_id: Mapped[int] = mapped_column(
-        ForeignKey("resumes.id", ondelete="CASCADE"),
         primary_key=True,
     )
     vacancy_id: Mapped[int] = mapped_column(
         ForeignKey("vacancies.id", ondelete="CASCADE"),
         primary_key=True,
+        index=True,
     )
 
     cover_letter: Mapped[str|None]
+
+
+class ResumeSalaryHistogramOrm(Base):
+    """Материализованная гистограмма зарплат, обновляется инкрементально из resume_salary_changes"""
+
+    __tablename__ = 'resume_salary_histogram'
+    __table_args__ = {'comment': 'Гистограмма зарплат резюме по типу занятости и слову заголовка'}
+
+    workload: Mapped[WorkLoad] = mapped_column(primary_key=True, comment='Рабочая нагрузка')
+    keyword: Mapped[str256] = mapped_column(
+        primary_key=True, comment='Слово из заголовка резюме в нижнем регистре, пустая строка - все резюме'
+    )
+    bucket: Mapped[int] = mapped_column(primary_key=True, comment='Нижняя граница корзины зарплаты')
+    resumes_count: Mapped[int] = mapped_column(BigInteger, comment='Число резюме в корзине')
+    salary_sum: Mapped[int] = mapped_column(BigInteger, comment='Сумма зарплат в корзине')
+
+
+class ResumeSalaryChangesOrm(Base):
+    """Журнал изменений зарплат резюме, заполняется триггером и разбирается при обновлении гистограммы"""
+
+    __tablename__ = 'resume_salary_changes'
+    __table_args__ = {'comment': 'Необработанные изменения зарплат резюме'}
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    workload: Mapped[WorkLoad]
+    title: Mapped[str256]
+    salary: Mapped[int]
+    sign: Mapped[int] = mapped_column(SmallInteger, comment='+1 - резюме добавлено, -1 - удалено')
+
+
+class AnalyticsRefreshesOrm(Base):
+
+    __tablename__ = 'analytics_refreshes'
+    __table_args__ = {'comment': 'Время последнего обновления материализованной аналитики'}
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    refreshed_at: Mapped[datetime.datetime]
+
+
+create_partitions(ResumesOrm.__table__)
+create_partitions(VacanciesRepliesOrm.__table__)
+
+# триггер уведомляет процессы приложения об изменении резюме (инвалидация кэша ответов)
+event.listen(ResumesOrm.__table__, 'after_create', DDL(f"""
+CREATE OR REPLACE FUNCTION notify_resumes_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('{RESUMES_CHANGED_CHANNEL}', OLD.id::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""))
+event.listen(ResumesOrm.__table__, 'after_create', DDL("""
+CREATE TRIGGER resumes_changed
+AFTER UPDATE OR DELETE ON resumes
+FOR EACH ROW EXECUTE FUNCTION notify_resumes_changed()
+"""))
+
+
+# триггеры пишут изменения зарплат в журнал для инкрементального обновления гистограммы
+event.listen(ResumesOrm.__table__, 'after_create', DDL("""
+CREATE OR REPLACE FUNCTION track_resume_salary_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO resume_salary_changes (workload, title, salary, sign)
+        SELECT workload, title, salary, -1 FROM old_rows WHERE salary IS NOT NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO resume_salary_changes (workload, title, salary, sign)
+        SELECT workload, title, salary, 1 FROM new_rows WHERE salary IS NOT NULL;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""))
+event.listen(ResumesOrm.__table__, 'after_create', DDL("""
+CREATE TRIGGER resumes_salary_insert
+AFTER INSERT ON resumes REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION track_resume_salary_changes()
+"""))
+event.listen(ResumesOrm.__table__, 'after_create', DDL("""
+CREATE TRIGGER resumes_salary_update
+AFTER UPDATE ON resumes REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION track_resume_salary_changes()
+"""))
+event.listen(ResumesOrm.__table__, 'after_create', DDL("""
+CREATE TRIGGER resumes_salary_delete
+AFTER DELETE ON resumes REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION track_resume_salary_changes()
+"""))
+
+
+def track_count(table: str, column: str, source: str, key: str):
+    """
+    Триггеры уровня оператора, поддерживающие table.column равным числу строк source с этим key.
+    Изменения группируются по ключу через таблицы переходов, поэтому массовая вставка обновляет
+    каждую строку table один раз (работают и на секционированных таблицах).
+    """
+    event.listen(Base.metadata.tables[source], 'after_create', DDL(f"""
+CREATE OR REPLACE FUNCTION track_{table}_{column}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE {table} SET {column} = {column} + delta.n
+        FROM (SELECT {key}, count(*) AS n FROM new_rows GROUP BY {key}) AS delta
+        WHERE {table}.id = delta.{key};
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE {table} SET {column} = {column} - delta.n
+        FROM (SELECT {key}, count(*) AS n FROM old_rows GROUP BY {key}) AS delta
+        WHERE {table}.id = delta.{key};
+    ELSE
+        -- при UPDATE счётчики меняются, только если строка перешла к другому {key}
+        UPDATE {table} SET {column} = {column} + delta.n
+        FROM (
+            SELECT {key}, sum(n) AS n FROM (
+                SELECT {key}, 1 AS n FROM new_rows
+                UNION ALL
+                SELECT {key}, -1 FROM old_rows
+            ) AS moved
+            GROUP BY {key} HAVING sum(n) <> 0
+        ) AS delta
+        WHERE {table}.id = delta.{key};
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""))
+    for event_name, referencing in (
+        ('insert', 'NEW TABLE AS new_rows'),
+        ('update', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+        ('delete', 'OLD TABLE AS old_rows'),
+    ):
+        event.listen(Base.metadata.tables[source], 'after_create', DDL(f"""
+CREATE TRIGGER {source}_{column}_{event_name}
+AFTER {event_name.upper()} ON {source} REFERENCING {referencing}
+FOR EACH STATEMENT EXECUTE FUNCTION track_{table}_{column}()
+"""))
+
+
+for counter in COUNTERS:
+    track_count(*counter)
+
+
+if PARTITIONS:
+    # замена ON DELETE CASCADE внешнего ключа vacancies_replies.resume_id
+    event.listen(VacanciesRepliesOrm.__table__, 'after_create', DDL("""
+CREATE OR REPLACE FUNCTION delete_resume_replies() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM vacancies_replies WHERE resume_id IN (SELECT id FROM old_rows);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""))
+    event.listen(VacanciesRepliesOrm.__table__, 'after_create', DDL("""
+CREATE TRIGGER resumes_delete_replies
+AFTER DELETE ON resumes REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION delete_resume_replies()
+"""))
+    # замена проверки внешнего ключа: отклик только на существующее резюме (ошибка с тем же кодом 23503).
+    # FOR KEY SHARE, как и у внешнего ключа, не даёт удалить резюме до конца транзакции с откликом
+    event.listen(VacanciesRepliesOrm.__table__, 'after_create', DDL("""
+CREATE OR REPLACE FUNCTION check_replies_resume_exists() RETURNS trigger AS $$
+DECLARE
+    missing integer;
+BEGIN
+    PERFORM 1 FROM resumes WHERE id IN (SELECT resume_id FROM new_rows) FOR KEY SHARE;
+    SELECT resume_id INTO missing FROM new_rows
+    WHERE NOT EXISTS (SELECT 1 FROM resumes WHERE resumes.id = new_rows.resume_id)
+    LIMIT 1;
+    IF FOUND THEN
+        RAISE foreign_key_violation USING
+            MESSAGE = 'insert or update on table "vacancies_replies" violates foreign key "resume_id"',
+            DETAIL = format('Key (resume_id)=(%%s) is not present in table "resumes".', missing);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""))
+    for event_name in ('insert', 'update'):
+        event.listen(VacanciesRepliesOrm.__table__, 'after_create', DDL(f"""
+CREATE TRIGGER vacancies_replies_resume_{event_name}
+AFTER {event_name.upper()} ON vacancies_replies REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION check_replies_resume_exists()
+"""))
@@ -2,12 +2,17 @@
 DTO (data transfer model). Модели для удобной работы с объектами БД и преобразования их в JSON.
 """
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Generic, Optional, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from models.enums import WorkLoad
 
+ItemT = TypeVar('ItemT')
+
+# значение колонки integer: число вне диапазона отклоняется проверкой, а не ошибкой драйвера при записи
+int4 = Annotated[int, Field(ge=-2 ** 31, le=2 ** 31 - 1)]
+
 
 class WorkersAddDTO(BaseModel):
     """Модель для добавления записей в workers"""
@@ -19,15 +24,16 @@ class WorkersDTO(WorkersAddDTO):
     """Модель для получения записей из workers"""
 
     id: int
+    resume_count: int
 
 
 class ResumesAddDTO(BaseModel):
     """Модель для добавления записей в resumes"""
 
     title: str
-    salary: Optional[int]
+    salary: Optional[int4]
     workload: WorkLoad
-    worker_id: int
+    worker_id: int4
 
 
 class ResumesDTO(ResumesAddDTO):
@@ -53,6 +59,15 @@ class VacanciesAddDTO(BaseModel):
 
 class VacanciesDTO(VacanciesAddDTO):
     id: int
+    reply_count: int
+
+
+class VacanciesRepliesAddDTO(BaseModel):
+    """Модель для добавления откликов на вакансии"""
+
+    resume_id: int4
+    vacancy_id: int4
+    cover_letter: Optional[str] = None
 
 
 class VacanciesWithoutCompensationDTO(BaseModel):
@@ -67,4 +82,75 @@ class ResumesRelVacanciesRepliedDTO(ResumesDTO):
 
 class M2MResumesVacanciesDTO(ResumesDTO):
     worker: WorkersDTO
-    vacancies_replied: list[VacanciesWithoutCompensationDTO]
\ No newline at end of file
+    vacancies_replied: list[VacanciesWithoutCompensationDTO]
+
+
+class PageDTO(BaseModel, Generic[ItemT]):
+    """Страница списка при курсорной пагинации"""
+
+    items: list[ItemT]
+    next_cursor: Optional[str]
+    approximate_total: Optional[int] = None
+
+
+class BulkBatchDTO(BaseModel):
+    """Отчёт о записи одной порции при массовой загрузке"""
+
+    batch: int
+    rows: int
+    elapsed_ms: float
+
+
+class BulkIngestDTO(BaseModel):
+    """Отчёт о массовой загрузке"""
+
+    rows: int
+    method: Optional[str]
+    elapsed_ms: float
+    batches: list[BulkBatchDTO]
+
+
+class BulkRepliesBatchDTO(BulkBatchDTO):
+    """Отчёт о записи одной порции откликов"""
+
+    inserted: int
+    duplicates: int
+
+
+class BulkRepliesDTO(BaseModel):
+    """Отчёт о массовом добавлении откликов"""
+
+    rows: int
+    inserted: int
+    duplicates: int
+    elapsed_ms: float
+    batches: list[BulkRepliesBatchDTO]
+
+
+class SalaryBucketDTO(BaseModel):
+    """Корзина гистограммы зарплат"""
+
+    salary_from: int
+    salary_to: int
+    resumes_count: int
+
+
+class WorkloadSalaryStatsDTO(BaseModel):
+    """Статистика зарплат по типу занятости"""
+
+    workload: WorkLoad
+    resumes_count: int
+    avg_salary: int
+    p50_salary: int
+    p90_salary: int
+    p99_salary: int
+    histogram: list[SalaryBucketDTO]
+
+
+class SalaryAnalyticsDTO(BaseModel):
+    """Аналитика зарплат резюме с отметкой о свежести данных"""
+
+    keyword: str
+    refreshed_at: datetime
+    staleness_seconds: float
+    workloads: list[WorkloadSalaryStatsDTO]
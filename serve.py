@@ -0,0 +1,96 @@
+"""
+Запуск приложения в нескольких процессах uvicorn.
+Число процессов по умолчанию равно числу доступных ядер. Каждый процесс создаёт свои движки и пулы
+соединений (процессы запускаются через spawn, а при fork пулы пересоздаются, см. databases_queries).
+Если задан предел соединений с БД, размер пула каждого процесса уменьшается так, чтобы все процессы
+вместе не превысили его (предел действует для каждого сервера БД - основного и каждой реплики).
+Одно соединение пула основного сервера в каждом процессе постоянно занято подпиской на NOTIFY для инвалидации
+кэша (core.cache), поэтому каждому процессу нужно хотя бы два соединения.
+Метрики Prometheus собираются со всех процессов через общий каталог PROMETHEUS_MULTIPROC_DIR.
+
+python serve.py --workers 8 --max-db-connections 90
+"""
+import argparse
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+from config import app_settings, database_settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+logger.addHandler(logging.StreamHandler())
+
+# соединения пула, постоянно занятые подпиской CacheInvalidationListener
+LISTENER_CONNECTIONS = 1
+
+
+def available_cores() -> int:
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def pool_limits(workers: int, max_connections: int) -> tuple[int, int]:
+    """
+    Размер пула и переполнение на процесс, при которых процессы вместе не превышают max_connections.
+    Подписка на NOTIFY держит соединение пула, поэтому запросам остаётся хотя бы одно сверх него.
+    """
+    if not max_connections:
+        pool_size, max_overflow = database_settings.POOL_SIZE, database_settings.MAX_OVERFLOW
+    else:
+        per_process = max_connections // workers
+        if per_process <= LISTENER_CONNECTIONS:
+            raise SystemExit(
+                f'Предела в {max_connections} соединений не хватает на {workers} процессов: каждому нужно '
+                f'хотя бы {LISTENER_CONNECTIONS + 1} (одно занято подпиской на NOTIFY)'
+            )
+        pool_size = min(database_settings.POOL_SIZE, per_process)
+        max_overflow = min(database_settings.MAX_OVERFLOW, per_process - pool_size)
+    if pool_size + max_overflow <= LISTENER_CONNECTIONS:
+        raise SystemExit(
+            f'Пула в {pool_size + max_overflow} соединений не хватает: одно занято подпиской на NOTIFY, '
+            'увеличьте DB_POOL_SIZE или DB_MAX_OVERFLOW'
+        )
+    return pool_size, max_overflow
+
+
+def prepare_metrics_dir():
+    """Общий каталог метрик процессов; файлы прошлого запуска удаляются"""
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir is None:
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='prometheus-')
+        return
+    Path(metrics_dir).mkdir(parents=True, exist_ok=True)
+    for stale in Path(metrics_dir).glob('*.db'):
+        stale.unlink()
+
+
+def main(host: str, port: int, workers: int, max_connections: int):
+    pool_size, max_overflow = pool_limits(workers, max_connections)
+    # настройки DB_* читаются дочерними процессами из окружения
+    os.environ['DB_POOL_SIZE'] = str(pool_size)
+    os.environ['DB_MAX_OVERFLOW'] = str(max_overflow)
+    prepare_metrics_dir()
+    logger.info(
+        f'Процессов: {workers}, соединений с каждым сервером БД на процесс: до {pool_size + max_overflow} '
+        f'(пул {pool_size}, переполнение {max_overflow}, из них {LISTENER_CONNECTIONS} - подписка на NOTIFY), '
+        f'всего до {workers * (pool_size + max_overflow)}'
+    )
+    uvicorn.run('main:app', host=host, port=port, workers=workers)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Запуск приложения в нескольких процессах')
+    parser.add_argument('--host', default=app_settings.HOST)
+    parser.add_argument('--port', type=int, default=app_settings.PORT)
+    parser.add_argument('--workers', type=int, default=available_cores(), help='Число процессов')
+    parser.add_argument(
+        '--max-db-connections', type=int, default=database_settings.MAX_CONNECTIONS,
+        help='Предел соединений с каждым сервером БД от всех процессов (0 - без ограничения)'
+    )
+    args = parser.parse_args()
+    main(args.host, args.port, args.workers, args.max_db_connections)
@@ -0,0 +1,42 @@
+"""
+Тесты с фикстурой database обращаются к PostgreSQL из настроек DB_* и пропускаются, если сервер недоступен
+или таблицы приложения не созданы. Такие тесты работают только со своими записями и удаляют их за собой.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import inspect
+
+from databases_queries import engine
+from models.declarative_models import Base
+
+
+async def _missing_tables() -> set[str]:
+    try:
+        async with engine.connect() as conn:
+            existing = await conn.run_sync(lambda sync_conn: set(inspect(sync_conn).get_table_names()))
+    finally:
+        await engine.dispose()
+    return set(Base.metadata.tables) - existing
+
+
+@pytest.fixture(scope='session')
+def database():
+    try:
+        missing = asyncio.run(_missing_tables())
+    except (OSError, asyncio.TimeoutError) as exc:
+        pytest.skip(f'PostgreSQL недоступен: {exc!r}')
+    if missing:
+        pytest.skip(f'Нет таблиц {", ".join(sorted(missing))}, примените миграции')
+
+
+@pytest.fixture
+def run(database):
+    """Выполнение корутины в новом цикле событий; соединения пула привязаны к циклу и закрываются после неё"""
+    async def wrapped(coroutine):
+        try:
+            return await coroutine
+        finally:
+            await engine.dispose()
+
+    return lambda coroutine: asyncio.run(wrapped(coroutine))
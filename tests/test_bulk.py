@@ -0,0 +1,118 @@
+import json
+
+import httpx
+from sqlalchemy import delete, func, select
+
+from databases_queries import session_factory
+from main import app
+from models.declarative_models import ResumesOrm, VacanciesOrm, VacanciesRepliesOrm, WorkersOrm
+from models.enums import WorkLoad
+
+USERNAME = 'test_bulk_rollback'
+
+
+async def post_and_count(body: bytes) -> tuple[int, int]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        response = await client.post(
+            '/workers/bulk', params={'batch_size': 1}, content=body,
+            headers={'content-type': 'application/x-ndjson'}
+        )
+    async with session_factory() as session:
+        count = await session.scalar(select(func.count()).filter(WorkersOrm.username == USERNAME))
+        await session.execute(delete(WorkersOrm).filter(WorkersOrm.username == USERNAME))
+        await session.commit()
+    return response.status_code, count
+
+
+def test_validation_error_mid_stream_rolls_back_written_batches(run):
+    # две порции по одной записи уже записаны через COPY, когда третья строка не проходит проверку
+    body = f'{{"username": "{USERNAME}"}}\n{{"username": "{USERNAME}"}}\n{{"username": 1}}\n'.encode()
+    assert run(post_and_count(body)) == (422, 0)
+
+
+def test_all_batches_are_committed(run):
+    body = f'{{"username": "{USERNAME}"}}\n{{"username": "{USERNAME}"}}\n'.encode()
+    assert run(post_and_count(body)) == (201, 2)
+
+
+async def post_resumes(worker_ids: list) -> tuple[int, int]:
+    """Резюме порциями по одному на работника теста ('worker') или на заданные ID: статус и число сохранённых"""
+    async with session_factory() as session:
+        worker = WorkersOrm(username=USERNAME)
+        session.add(worker)
+        await session.flush()
+        own_id = worker.id
+        await session.commit()
+    items = [
+        {'title': USERNAME, 'salary': 1, 'workload': 'fulltime', 'worker_id': own_id if ident == 'worker' else ident}
+        for ident in worker_ids
+    ]
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            response = await client.post('/resumes/bulk', params={'batch_size': 1}, content=json.dumps(items))
+        async with session_factory() as session:
+            count = await session.scalar(select(func.count()).filter(ResumesOrm.title == USERNAME))
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(ResumesOrm).filter(ResumesOrm.title == USERNAME))
+            await session.execute(delete(WorkersOrm).filter(WorkersOrm.username == USERNAME))
+            await session.commit()
+    return response.status_code, count
+
+
+def test_resume_of_missing_worker_is_conflict(run):
+    # ошибка внешнего ключа приходит из COPY во второй порции, первая уже записана
+    assert run(post_resumes(['worker', 2 ** 31 - 1])) == (409, 0)
+
+
+def test_worker_id_outside_column_range_is_rejected(run):
+    assert run(post_resumes(['worker', 2 ** 31])) == (422, 0)
+
+
+async def post_replies(replies: list[dict]) -> tuple[int, dict, int]:
+    """Отклики на собственные резюме и вакансию теста: статус, тело ответа и число сохранённых откликов"""
+    async with session_factory() as session:
+        worker = WorkersOrm(username=USERNAME)
+        vacancy = VacanciesOrm(title=USERNAME, compensation=1)
+        session.add_all([worker, vacancy])
+        await session.flush()
+        resume = ResumesOrm(title=USERNAME, salary=1, workload=WorkLoad.FULLTIME, worker_id=worker.id)
+        session.add(resume)
+        await session.flush()
+        ids = {'resume': resume.id, 'vacancy': vacancy.id}
+        await session.commit()
+    body = [{'resume_id': ids.get(reply['resume_id'], reply['resume_id']), 'vacancy_id': ids['vacancy']}
+            for reply in replies]
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            response = await client.post('/vacancies/replies/bulk', content=json.dumps(body))
+        async with session_factory() as session:
+            count = await session.scalar(
+                select(func.count()).filter(VacanciesRepliesOrm.vacancy_id == ids['vacancy'])
+            )
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(VacanciesOrm).filter(VacanciesOrm.id == ids['vacancy']))
+            await session.execute(delete(WorkersOrm).filter(WorkersOrm.username == USERNAME))
+            await session.commit()
+    return response.status_code, response.json(), count
+
+
+def test_duplicate_replies_are_skipped(run):
+    status_code, report, count = run(post_replies([{'resume_id': 'resume'}, {'resume_id': 'resume'}]))
+    assert status_code == 201
+    assert (report['rows'], report['inserted'], report['duplicates']) == (2, 1, 1)
+    assert count == 1
+
+
+def test_reply_to_missing_resume_is_conflict(run):
+    status_code, _, count = run(post_replies([{'resume_id': 'resume'}, {'resume_id': 2 ** 31 - 1}]))
+    assert (status_code, count) == (409, 0)
+
+
+def test_reply_id_outside_column_range_is_rejected(run):
+    status_code, _, count = run(post_replies([{'resume_id': 'resume'}, {'resume_id': 2 ** 31}]))
+    assert (status_code, count) == (422, 0)
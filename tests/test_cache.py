@@ -0,0 +1,78 @@
+import pytest
+
+import core.cache
+from core.cache import CacheInvalidationListener, CachedResponse, ResponseCache
+
+PAYLOAD = CachedResponse(content=b'{}', headers={'ETag': '"1"'})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(core.cache, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_get_returns_stored_payload():
+    cache = ResponseCache(max_size=10, ttl=60)
+    assert cache.get(1) is None
+    cache.set(1, PAYLOAD)
+    assert cache.get(1) is PAYLOAD
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_size=2, ttl=60)
+    cache.set(1, PAYLOAD)
+    cache.set(2, PAYLOAD)
+    cache.get(1)
+    cache.set(3, PAYLOAD)
+    assert cache.get(2) is None
+    assert cache.get(1) is PAYLOAD
+    assert cache.get(3) is PAYLOAD
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = ResponseCache(max_size=10, ttl=60)
+    cache.set(1, PAYLOAD)
+    clock[0] = 60
+    assert cache.get(1) is PAYLOAD
+    clock[0] = 60.1
+    assert cache.get(1) is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_payload_read_before_invalidation_is_not_stored():
+    cache = ResponseCache(max_size=10, ttl=60)
+    generation = cache.generation
+    cache.invalidate(1)
+    cache.set(1, PAYLOAD, generation)
+    assert cache.get(1) is None
+    cache.set(1, PAYLOAD, cache.generation)
+    assert cache.get(1) is PAYLOAD
+
+
+def test_invalidate_and_clear():
+    cache = ResponseCache(max_size=10, ttl=60)
+    cache.set(1, PAYLOAD)
+    cache.set(2, PAYLOAD)
+    cache.invalidate(1)
+    assert cache.get(1) is None
+    assert cache.get(2) is PAYLOAD
+    cache.clear()
+    assert cache.get(2) is None
+    assert cache.stats()['invalidations'] == 2
+
+
+def test_notification_invalidates_resume_and_bad_payload_clears_cache():
+    cache = ResponseCache(max_size=10, ttl=60)
+    listener = CacheInvalidationListener(cache, 'resumes_changed')
+    cache.set(1, PAYLOAD)
+    cache.set(2, PAYLOAD)
+    listener._on_notify(None, 0, 'resumes_changed', '1')
+    assert cache.get(1) is None
+    assert cache.get(2) is PAYLOAD
+    listener._on_notify(None, 0, 'resumes_changed', 'not an id')
+    assert cache.get(2) is None
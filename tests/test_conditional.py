@@ -0,0 +1,139 @@
+import datetime
+
+import httpx
+import pytest
+from sqlalchemy import delete, update
+from starlette.requests import Request
+
+from core.conditional import is_not_modified, make_etag, validator_headers
+from core.pagination import encode_cursor
+from databases_queries import session_factory
+from main import app
+from models.declarative_models import ResumesOrm, WorkersOrm
+from models.enums import WorkLoad
+
+LAST_MODIFIED = datetime.datetime(2026, 10, 18, 9, 30, 15, 123456)
+HEADERS = validator_headers(make_etag('resume', 1, LAST_MODIFIED), LAST_MODIFIED)
+
+
+def request(**headers) -> Request:
+    return Request({
+        'type': 'http',
+        'headers': [(name.replace('_', '-').encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_validator_headers():
+    assert HEADERS['Last-Modified'] == 'Sun, 18 Oct 2026 09:30:15 GMT'
+    assert HEADERS['ETag'].startswith('"') and HEADERS['ETag'].endswith('"')
+    assert make_etag('resume', 1, LAST_MODIFIED) != make_etag('resume', 1, LAST_MODIFIED.replace(microsecond=0))
+    assert 'Last-Modified' not in validator_headers('"1"', None)
+
+
+@pytest.mark.parametrize('if_none_match, expected', [
+    (HEADERS['ETag'], True),
+    (f'W/{HEADERS["ETag"]}', True),
+    (f'"other", {HEADERS["ETag"]}', True),
+    ('*', True),
+    ('"other"', False),
+])
+def test_if_none_match(if_none_match, expected):
+    assert is_not_modified(request(if_none_match=if_none_match), HEADERS) is expected
+
+
+@pytest.mark.parametrize('if_modified_since, expected', [
+    ('Sun, 18 Oct 2026 09:30:15 GMT', True),
+    ('Sun, 18 Oct 2026 10:00:00 GMT', True),
+    ('Sun, 18 Oct 2026 09:30:14 GMT', False),
+    ('not a date', False),
+])
+def test_if_modified_since(if_modified_since, expected):
+    assert is_not_modified(request(if_modified_since=if_modified_since), HEADERS) is expected
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    conditional = request(if_none_match='"other"', if_modified_since='Sun, 18 Oct 2026 10:00:00 GMT')
+    assert not is_not_modified(conditional, HEADERS)
+
+
+def test_unconditional_request():
+    assert not is_not_modified(request(), HEADERS)
+
+
+USERNAME = 'test_conditional_page'
+
+
+async def page_statuses_after_delete() -> tuple[dict, int, int]:
+    """
+    Страница из трёх резюме теста: заголовки первого ответа и статусы повторных условных запросов
+    (If-None-Match и If-Modified-Since) после удаления среднего резюме
+    """
+    async with session_factory() as session:
+        worker = WorkersOrm(username=USERNAME)
+        session.add(worker)
+        await session.flush()
+        resumes = [
+            ResumesOrm(title=USERNAME, salary=1, workload=WorkLoad.FULLTIME, worker_id=worker.id) for _ in range(3)
+        ]
+        session.add_all(resumes)
+        await session.flush()
+        ids = [resume.id for resume in resumes]
+        await session.commit()
+    params = {'cursor': encode_cursor(id=ids[0] - 1), 'limit': 3}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            first = await client.get('/resumes', params=params)
+            async with session_factory() as session:
+                await session.execute(delete(ResumesOrm).filter(ResumesOrm.id == ids[1]))
+                await session.commit()
+            by_etag = await client.get('/resumes', params=params, headers={'If-None-Match': first.headers['ETag']})
+            by_date = await client.get(
+                '/resumes', params=params, headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'}
+            )
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(WorkersOrm).filter(WorkersOrm.username == USERNAME))
+            await session.commit()
+    return dict(first.headers), by_etag.status_code, by_date.status_code
+
+
+def test_page_changes_after_row_is_deleted(run):
+    headers, by_etag, by_date = run(page_statuses_after_delete())
+    assert 'etag' in headers and 'last-modified' not in headers
+    assert (by_etag, by_date) == (200, 200)
+
+
+async def page_with_worker_after_rename() -> tuple[httpx.Response, httpx.Response]:
+    """Страница с ?include=worker до и после переименования работника (с If-None-Match: *)"""
+    async with session_factory() as session:
+        worker = WorkersOrm(username=USERNAME)
+        session.add(worker)
+        await session.flush()
+        resume = ResumesOrm(title=USERNAME, salary=1, workload=WorkLoad.FULLTIME, worker_id=worker.id)
+        session.add(resume)
+        await session.flush()
+        params = {'cursor': encode_cursor(id=resume.id - 1), 'limit': 1, 'include': 'worker'}
+        await session.commit()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            first = await client.get('/resumes', params=params)
+            async with session_factory() as session:
+                await session.execute(
+                    update(WorkersOrm).filter(WorkersOrm.username == USERNAME).values(username=f'{USERNAME}_renamed')
+                )
+                await session.commit()
+            second = await client.get('/resumes', params=params, headers={'If-None-Match': '*'})
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(WorkersOrm).filter(WorkersOrm.username.startswith(USERNAME)))
+            await session.commit()
+    return first, second
+
+
+def test_page_with_include_has_no_validators(run):
+    first, second = run(page_with_worker_after_rename())
+    assert 'etag' not in first.headers
+    assert second.status_code == 200
+    assert second.json()['items'][0]['worker']['username'] == f'{USERNAME}_renamed'
@@ -0,0 +1,78 @@
+import pytest
+from fastapi import HTTPException
+
+from core.fields import RESUMES_FIELDS, RESUMES_INCLUDE, WORKERS_FIELDS, WORKERS_INCLUDE, parse_names, trimmed_schema
+from core.statements import RESUMES_RELATIONS, WORKERS_RELATIONS
+from models.schemas import M2MResumesVacanciesDTO, ResumesDTO, WorkersDTO, WorkersRelDTO
+
+ALLOWED = ('id', 'title', 'salary')
+
+
+def test_parse_names_keeps_allowed_order_and_ignores_blanks():
+    assert parse_names(' salary, id,,salary ', ALLOWED, 'fields') == ('id', 'salary')
+
+
+@pytest.mark.parametrize('value', ['', ' , ', 'id,password'])
+def test_parse_names_rejects_empty_and_unknown(value):
+    with pytest.raises(HTTPException) as exc_info:
+        parse_names(value, ALLOWED, 'fields')
+    assert exc_info.value.status_code == 400
+
+
+def test_unknown_names_are_listed_in_error():
+    with pytest.raises(HTTPException) as exc_info:
+        parse_names('id,password,email', ALLOWED, 'fields')
+    assert 'email, password' in exc_info.value.detail
+
+
+def test_fields_allow_only_columns_present_in_schema():
+    assert WORKERS_FIELDS.allowed == ('username', 'id', 'resume_count')
+    assert RESUMES_FIELDS() == ()
+    assert RESUMES_FIELDS('id,title') == ('title', 'id')
+    assert RESUMES_FIELDS.omitted(()) == ()
+    assert set(RESUMES_FIELDS.omitted(('title', 'id'))) == set(RESUMES_FIELDS.allowed) - {'title', 'id'}
+
+
+def test_trimmed_schema_drops_omitted_fields():
+    schema = trimmed_schema(ResumesDTO, RESUMES_FIELDS.omitted(('id', 'title')))
+    assert list(schema.model_fields) == ['title', 'id']
+    assert schema.model_fields['id'].annotation is int
+    assert schema.model_validate({'id': 1, 'title': 'Python', 'salary': 1}).model_dump() == {'title': 'Python', 'id': 1}
+
+
+def test_trimmed_schema_is_built_once():
+    omitted = RESUMES_FIELDS.omitted(('id',))
+    assert trimmed_schema(ResumesDTO, omitted) is trimmed_schema(ResumesDTO, omitted)
+    assert trimmed_schema(ResumesDTO, ()) is ResumesDTO
+
+
+def test_include_names_match_statement_relations():
+    assert set(WORKERS_INCLUDE.allowed) == set(WORKERS_RELATIONS)
+    assert set(RESUMES_INCLUDE.allowed) == set(RESUMES_RELATIONS)
+
+
+def test_include_is_parsed_in_relations_order():
+    assert WORKERS_INCLUDE() == ()
+    assert WORKERS_INCLUDE('resumes_fulltime,resumes') == ('resumes', 'resumes_fulltime')
+    with pytest.raises(HTTPException) as exc_info:
+        RESUMES_INCLUDE('worker,resumes')
+    assert exc_info.value.status_code == 400
+
+
+def test_include_uses_prepared_variants():
+    assert WORKERS_INCLUDE.schema(()) is WorkersDTO
+    assert WORKERS_INCLUDE.schema(('resumes',)) is WorkersRelDTO
+    assert RESUMES_INCLUDE.schema(('worker', 'vacancies')) is M2MResumesVacanciesDTO
+
+
+def test_include_builds_missing_variant_once():
+    include = ('resumes', 'resumes_parttime', 'resumes_fulltime')
+    schema = WORKERS_INCLUDE.schema(include)
+    assert schema is WORKERS_INCLUDE.schema(include)
+    assert set(schema.model_fields) == set(WorkersDTO.model_fields) | set(include)
+    assert schema.model_fields['resumes_parttime'].annotation == list[ResumesDTO]
+
+
+def test_fields_trim_columns_but_keep_included_relations():
+    schema = trimmed_schema(RESUMES_INCLUDE.schema(('worker', 'vacancies')), RESUMES_FIELDS.omitted(('id',)))
+    assert list(schema.model_fields) == ['id', 'worker', 'vacancies_replied']
@@ -0,0 +1,19 @@
+import asyncio
+
+import httpx
+
+from core.pagination import MAX_ID
+from main import app
+
+
+async def get_concurrently(urls: list[str]) -> list[int]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        responses = await asyncio.gather(*(client.get(url) for url in urls))
+    return [response.status_code for response in responses]
+
+
+def test_out_of_range_id_does_not_fail_batched_requests(run):
+    # запросы одного такта загружаются одним пакетом: некорректный ID отклоняется до загрузчика
+    urls = [f'/resumes/{MAX_ID}', f'/resumes/{MAX_ID + 1}', f'/resumes/{MAX_ID - 1}']
+    assert run(get_concurrently(urls)) == [404, 422, 404]
@@ -0,0 +1,39 @@
+import pytest
+from fastapi import HTTPException
+
+from core.pagination import MAX_ID, MIN_ID, PageParams, encode_cursor
+
+
+def test_cursor_round_trip():
+    page = PageParams(cursor=encode_cursor(id=42), limit=10)
+    assert page.after_id == 42
+    assert page.query_params() == {'after_id': 42, 'limit': 11}
+
+
+def test_next_cursor_points_to_last_row_of_page():
+    class Row:
+        def __init__(self, id):
+            self.id = id
+
+    page = PageParams(cursor=None, limit=2)
+    assert page.next_cursor([Row(1), Row(2)]) is None
+    assert PageParams(cursor=page.next_cursor([Row(1), Row(2), Row(3)]), limit=2).after_id == 2
+
+
+@pytest.mark.parametrize('cursor', ['not base64 json', encode_cursor(id='1'), encode_cursor(id=1.5)])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        PageParams(cursor=cursor, limit=10)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.parametrize('after_id', [True, False, MIN_ID - 1, MAX_ID + 1, 2 ** 63])
+def test_cursor_id_outside_column_range_is_rejected(after_id):
+    with pytest.raises(HTTPException) as exc_info:
+        PageParams(cursor=encode_cursor(id=after_id), limit=10)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.parametrize('after_id', [MIN_ID, 0, MAX_ID])
+def test_cursor_id_at_column_bounds_is_accepted(after_id):
+    assert PageParams(cursor=encode_cursor(id=after_id), limit=10).after_id == after_id
@@ -0,0 +1,45 @@
+import httpx
+from sqlalchemy import delete
+
+from databases_queries import session_factory
+from main import app
+from models.declarative_models import ResumesOrm, WorkersOrm
+from models.enums import WorkLoad
+
+USERNAME = 'test_search'
+WORD = 'qzxjvword'
+
+
+async def search_pages(titles: list[str]) -> tuple[list[int], list[list[int]]]:
+    """ID созданных резюме с заголовками titles и ID резюме на страницах поиска по WORD"""
+    async with session_factory() as session:
+        worker = WorkersOrm(username=USERNAME)
+        session.add(worker)
+        await session.flush()
+        resumes = [ResumesOrm(title=title, salary=1, workload=WorkLoad.FULLTIME, worker_id=worker.id) for title in titles]
+        session.add_all(resumes)
+        await session.flush()
+        ids = [resume.id for resume in resumes]
+        await session.commit()
+    pages = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            params = {'q': WORD, 'limit': 2}
+            while True:
+                page = (await client.get('/resumes/search', params=params)).json()
+                pages.append([item['id'] for item in page['items']])
+                if page['next_cursor'] is None:
+                    break
+                params['cursor'] = page['next_cursor']
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(WorkersOrm).filter(WorkersOrm.username == USERNAME))
+            await session.commit()
+    return ids, pages
+
+
+def test_pages_follow_relevance_then_id_without_repeats(run):
+    ids, pages = run(search_pages([f'{WORD[:5]}wrd b', f'{WORD} a', f'{WORD}xx', f'{WORD} c', f'{WORD} d']))
+    # одинаковое (нулевое) расстояние у точных совпадений: между ними порядок по ID
+    assert pages == [[ids[1], ids[3]], [ids[4], ids[2]], [ids[0]]]
@@ -0,0 +1,84 @@
+import datetime
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from core.serialization import serialize
+from models.declarative_models import ResumesOrm, VacanciesOrm, WorkersOrm
+from models.enums import WorkLoad
+from models.schemas import (
+    M2MResumesVacanciesDTO, PageDTO, ResumesDTO, ResumesRelDTO, SalaryAnalyticsDTO, VacanciesDTO, WorkersDTO,
+    WorkersRelDTO
+)
+
+CREATED_AT = datetime.datetime(2026, 10, 18, 9, 30, 15, 123456)
+UPDATED_AT = datetime.datetime(2026, 10, 18, 9, 30, 15)
+
+
+def default_response(schema, data) -> bytes:
+    """Тело ответа FastAPI по умолчанию: проверка response_model, jsonable_encoder и JSONResponse"""
+    model = schema.model_validate(data, from_attributes=True)
+    return json.dumps(jsonable_encoder(model), ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def make_objects():
+    worker = WorkersOrm(id=1, username='Иван "Ivan" \\ \n\t  😀', resume_count=2)
+    resumes = [
+        ResumesOrm(
+            id=1, title='Python Разработчик </script>', salary=150000, workload=WorkLoad.FULLTIME, worker_id=1,
+            created_at=CREATED_AT, updated_at=UPDATED_AT
+        ),
+        ResumesOrm(
+            id=2, title='Data Engineer', salary=None, workload=WorkLoad.PARTTIME, worker_id=1,
+            created_at=UPDATED_AT, updated_at=CREATED_AT
+        ),
+    ]
+    vacancy = VacanciesOrm(id=1, title='Вакансия\u0000', compensation=None, reply_count=0)
+    worker.resumes = resumes
+    resumes[0].vacancies_replied = [vacancy]
+    resumes[1].vacancies_replied = []
+    return worker, resumes, vacancy
+
+
+def page(items, next_cursor=None, approximate_total=None) -> dict:
+    return {'items': items, 'next_cursor': next_cursor, 'approximate_total': approximate_total}
+
+
+def cases():
+    worker, resumes, vacancy = make_objects()
+    return [
+        (ResumesDTO, resumes[0]),
+        (ResumesDTO, resumes[1]),
+        (PageDTO[WorkersDTO], page([worker], next_cursor='eyJpZCI6MX0', approximate_total=10)),
+        (PageDTO[WorkersRelDTO], page([worker])),
+        (PageDTO[ResumesDTO], page(resumes, approximate_total=0)),
+        (PageDTO[ResumesRelDTO], page(resumes)),
+        (PageDTO[M2MResumesVacanciesDTO], page(resumes)),
+        (PageDTO[VacanciesDTO], page([vacancy])),
+        (PageDTO[ResumesDTO], page([])),
+        (SalaryAnalyticsDTO, {
+            'keyword': 'разработчик',
+            'refreshed_at': CREATED_AT,
+            'staleness_seconds': 1.5,
+            'workloads': [{
+                'workload': WorkLoad.FULLTIME, 'resumes_count': 1, 'avg_salary': 150000,
+                'p50_salary': 150000, 'p90_salary': 155000, 'p99_salary': 159500,
+                'histogram': [{'salary_from': 150000, 'salary_to': 160000, 'resumes_count': 1}],
+            }],
+        }),
+    ]
+
+
+@pytest.mark.parametrize('schema, data', cases())
+def test_serialize_matches_default_response(schema, data):
+    assert serialize(schema, data) == default_response(schema, data)
+
+
+def test_serialize_keeps_non_ascii_and_escapes():
+    _, resumes, _ = make_objects()
+    payload = serialize(ResumesRelDTO, resumes[0])
+    assert 'Иван \\"Ivan\\" \\\\ \\n\\t  😀'.encode() in payload
+    assert b'"created_at":"2026-10-18T09:30:15.123456"' in payload
+    assert b'"updated_at":"2026-10-18T09:30:15"' in payload
+    assert b'"workload":"fulltime"' in payload
@@ -0,0 +1,114 @@
+import asyncio
+
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from core.singleflight import SingleFlight, SingleFlightMiddleware
+
+
+class Backend:
+    """Приложение за middleware: считает вызовы, отвечает после release, первые fail вызовов - с ошибкой"""
+
+    def __init__(self, fail: int = 0):
+        self.calls = 0
+        self.fail = fail
+        self.release = asyncio.Event()
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        call = self.calls
+        await self.release.wait()
+        # как запрос к БД: ответ приходит не в том же шаге цикла событий
+        await asyncio.sleep(0)
+        if call <= self.fail:
+            raise RuntimeError('ошибка ведущего')
+        await PlainTextResponse(f'ответ {call}')(scope, receive, send)
+
+
+def make_middleware(backend: Backend, exclude: frozenset[str] = frozenset()):
+    flights = SingleFlight()
+    routes = [Route('/items', PlainTextResponse), Route('/export', PlainTextResponse)]
+    return SingleFlightMiddleware(backend, flights=flights, routes=routes, exclude=exclude), flights
+
+
+def scope(path: str = '/items', method: str = 'GET', headers=()) -> dict:
+    return {
+        'type': 'http', 'method': method, 'path': path, 'root_path': '', 'query_string': b'',
+        'headers': list(headers),
+    }
+
+
+async def request(app, request_scope: dict) -> bytes | Exception:
+    """Тело ответа или исключение приложения"""
+    body = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            body.append(message.get('body', b''))
+
+    try:
+        await app(request_scope, receive, send)
+    except Exception as exc:
+        return exc
+    return b''.join(body)
+
+
+async def concurrent(app, backend: Backend, scopes: list[dict]) -> list:
+    tasks = [asyncio.create_task(request(app, request_scope)) for request_scope in scopes]
+    # все запросы успевают дойти до middleware, прежде чем ведущий ответит
+    await asyncio.sleep(0)
+    backend.release.set()
+    return list(await asyncio.gather(*tasks))
+
+
+def test_identical_requests_share_leader_response():
+    async def main():
+        backend = Backend()
+        app, flights = make_middleware(backend)
+        results = await concurrent(app, backend, [scope() for _ in range(5)])
+        return backend, flights, results
+
+    backend, flights, results = asyncio.run(main())
+    assert backend.calls == 1
+    assert results == ['ответ 1'.encode()] * 5
+    assert flights.stats() == {'in_flight': 0, 'leaders': 1, 'coalesced': 4}
+
+
+def test_requests_with_different_key_headers_are_not_coalesced():
+    async def main():
+        backend = Backend()
+        app, _ = make_middleware(backend)
+        await concurrent(app, backend, [scope(headers=[(b'cookie', b'a=1')]), scope(headers=[(b'cookie', b'a=2')])])
+        return backend
+
+    assert asyncio.run(main()).calls == 2
+
+
+def test_excluded_routes_and_other_methods_pass_through():
+    async def main():
+        backend = Backend()
+        app, flights = make_middleware(backend, exclude=frozenset({'/export'}))
+        await concurrent(app, backend, [scope('/export'), scope('/export'), scope(method='POST'), scope(method='POST')])
+        return backend, flights
+
+    backend, flights = asyncio.run(main())
+    assert backend.calls == 4
+    assert flights.stats()['leaders'] == 0
+
+
+def test_follower_becomes_leader_after_leader_failure():
+    async def main():
+        backend = Backend(fail=1)
+        app, flights = make_middleware(backend)
+        results = await concurrent(app, backend, [scope() for _ in range(5)])
+        return backend, flights, results
+
+    backend, flights, results = asyncio.run(main())
+    # после ошибки ведущего приложение вызывается ещё один раз, а не по разу на каждого ожидающего
+    assert backend.calls == 2
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == ['ответ 2'.encode()] * 4
+    assert flights.stats() == {'in_flight': 0, 'leaders': 2, 'coalesced': 3}